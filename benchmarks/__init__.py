@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Benchmarks of the circulation state machine and REST actions.
+
+Run them from a source checkout with ``python -m benchmarks``, see
+``python -m benchmarks --help``. They are not installed with the package.
+"""
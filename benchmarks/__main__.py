@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Run the benchmarks and save the results as JSON."""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from invenio_db import db
+
+from .app import create_app
+from .scenarios import SCENARIOS
+
+
+def _percentile(values, percent):
+    """Return the given percentile of the sorted values."""
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_scenario(name, iterations, size, database_uri, search="sql"):
+    """Run a scenario in a new application and database.
+
+    The timings and the allocations are measured in separate runs, tracing
+    the allocations slows down the operations.
+    """
+    app = create_app(database_uri, search=search)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        run = SCENARIOS[name](app, size)
+
+        timings = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            run(i)
+            timings.append(time.perf_counter() - start)
+
+        allocations = []
+        tracemalloc.start()
+        for i in range(iterations, iterations + max(1, iterations // 10)):
+            before = tracemalloc.take_snapshot()
+            run(i)
+            after = tracemalloc.take_snapshot()
+            stats = after.compare_to(before, "filename")
+            allocations.append(
+                sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+            )
+        tracemalloc.stop()
+        db.session.remove()
+        db.drop_all()
+
+    timings.sort()
+    return dict(
+        iterations=iterations,
+        size=size,
+        ops_per_sec=iterations / sum(timings),
+        mean_ms=statistics.mean(timings) * 1000,
+        p50_ms=_percentile(timings, 50) * 1000,
+        p99_ms=_percentile(timings, 99) * 1000,
+        allocated_kib_per_op=statistics.mean(allocations) / 1024,
+    )
+
+
+def main(argv=None):
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        metavar="scenario",
+        help="scenarios to run, all by default: {}".format(
+            ", ".join(sorted(SCENARIOS))
+        ),
+    )
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=200,
+        help="number of items, loans or requests prepared by the scenarios",
+    )
+    parser.add_argument("--database-uri", default="sqlite://")
+    parser.add_argument(
+        "--search",
+        choices=["sql", "memory"],
+        default="sql",
+        help="search the loans in the database or in memory",
+    )
+    parser.add_argument("--output", help="JSON file to save the results to")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error("unknown scenarios: {}".format(", ".join(sorted(unknown))))
+
+    results = dict(
+        date=datetime.now(timezone.utc).isoformat(),
+        python=platform.python_version(),
+        database_uri=args.database_uri,
+        search=args.search,
+        scenarios={},
+    )
+    for name in args.scenarios or sorted(SCENARIOS):
+        result = run_scenario(
+            name, args.iterations, args.size, args.database_uri, search=args.search
+        )
+        results["scenarios"][name] = result
+        print(
+            "{:<30} {ops_per_sec:>9.1f} ops/s  p50 {p50_ms:>8.2f} ms  "
+            "p99 {p99_ms:>8.2f} ms  {allocated_kib_per_op:>9.1f} KiB/op".format(
+                name, **result
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Benchmarks application, on SQLite and without a search cluster.
+
+The loans are searched either in the database with the ``sql`` search
+backend, the indexing being a no-op, or in the memory index of the process.
+Both support the ``search_after`` pagination of the loans searches.
+"""
+
+import uuid
+import warnings
+from datetime import timedelta
+
+from flask import Flask
+from invenio_db import InvenioDB, db
+from invenio_jsonschemas import InvenioJSONSchemas
+from invenio_pidstore import InvenioPIDStore
+from invenio_records import InvenioRecords
+from invenio_records_rest import InvenioRecordsREST
+from invenio_records_rest.utils import PIDConverter, allow_all
+from invenio_rest import InvenioREST
+from sqlalchemy import event
+from sqlalchemy.exc import SAWarning
+
+from invenio_circulation import InvenioCirculation
+from invenio_circulation.api import Loan
+from invenio_circulation.pidstore.minters import loan_pid_minter
+from invenio_circulation.search.memory import LoansMemoryIndexer, LoansMemorySearch
+from invenio_circulation.search.sql import LoansSQLSearch
+from invenio_circulation.views import (
+    create_loan_actions_blueprint,
+    create_loan_replace_item_blueprint,
+)
+
+LOCATION_PID = "loc_pid"
+
+
+class NullIndexer(object):
+    """Indexer discarding the loans."""
+
+    def index(self, record, **kwargs):
+        """Do not index the record."""
+
+
+def _true(*args, **kwargs):
+    """Accept anything."""
+    return True
+
+
+def _ref_builder(loan_pid, loan):
+    """Return a reference that is not resolved."""
+    return {"ref": loan_pid}
+
+
+def create_app(database_uri="sqlite://", search="sql"):
+    """Create the benchmarks application.
+
+    :param search: `sql` or `memory`, where to search the loans.
+    """
+    app = Flask("invenio_circulation_benchmarks")
+    app.config.update(
+        SECRET_KEY="benchmarks",
+        SQLALCHEMY_DATABASE_URI=database_uri,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        JSONSCHEMAS_HOST="localhost:5000",
+        JSONSCHEMAS_ENDPOINT="/schema",
+        RECORDS_REST_ENDPOINTS={},
+        RECORDS_REST_DEFAULT_READ_PERMISSION_FACTORY=allow_all,
+        CIRCULATION_LOAN_SEARCH_BACKEND="sql" if search == "sql" else "search",
+        CIRCULATION_LOAN_INDEX_BUFFER=False,
+        CIRCULATION_ITEM_EXISTS=_true,
+        CIRCULATION_DOCUMENT_EXISTS=_true,
+        CIRCULATION_PATRON_EXISTS=_true,
+        CIRCULATION_ITEM_REF_BUILDER=_ref_builder,
+        CIRCULATION_PATRON_REF_BUILDER=_ref_builder,
+        CIRCULATION_DOCUMENT_REF_BUILDER=_ref_builder,
+        CIRCULATION_ITEM_LOCATION_RETRIEVER=lambda item_pid: LOCATION_PID,
+        CIRCULATION_TRANSACTION_LOCATION_VALIDATOR=_true,
+        CIRCULATION_TRANSACTION_USER_VALIDATOR=_true,
+        CIRCULATION_LOAN_LOCATIONS_VALIDATION=_true,
+        CIRCULATION_DOCUMENT_RETRIEVER_FROM_ITEM=lambda item_pid: "document_pid",
+        CIRCULATION_POLICIES=dict(
+            checkout=dict(
+                duration_default=lambda loan, initial_loan: timedelta(days=30),
+                duration_validate=_true,
+                item_can_circulate=_true,
+            ),
+            extension=dict(
+                from_end_date=True,
+                duration_default=lambda loan, initial_loan: timedelta(days=30),
+                max_count=lambda loan: float("inf"),
+            ),
+            request=dict(can_be_requested=_true),
+        ),
+    )
+    InvenioDB(app)
+    InvenioRecords(app)
+    InvenioPIDStore(app)
+    InvenioJSONSchemas(app)
+    InvenioREST(app)
+    InvenioCirculation(app)
+    endpoint = app.config["RECORDS_REST_ENDPOINTS"]["loanid"]
+    if search == "sql":
+        endpoint["search_class"] = LoansSQLSearch
+        endpoint["indexer_class"] = NullIndexer
+    else:
+        endpoint["search_class"] = LoansMemorySearch
+        endpoint["indexer_class"] = LoansMemoryIndexer
+    InvenioRecordsREST(app)
+    app.url_map.converters["pid"] = PIDConverter
+    app.register_blueprint(create_loan_actions_blueprint(app))
+    app.register_blueprint(create_loan_replace_item_blueprint(app))
+
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            _enable_sqlite_savepoints(db.engine)
+    # SQLAlchemy-Continuum flushes the record versions when the savepoint
+    # of `Record.create` and `Record.commit` is released, whatever the
+    # database: the warning is the same for every write of a loan.
+    warnings.filterwarnings(
+        "ignore",
+        message="nested transaction already deassociated from connection",
+        category=SAWarning,
+    )
+    return app
+
+
+def _enable_sqlite_savepoints(engine):
+    """Let SQLAlchemy manage the transactions, for the savepoints to work.
+
+    The pysqlite driver begins the transactions itself and does not support
+    the savepoints of SQLAlchemy: see "Serializable isolation / Savepoints /
+    Transactional DDL" in the SQLite dialect documentation of SQLAlchemy.
+    """
+
+    @event.listens_for(engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def do_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+def create_loan(data):
+    """Create and commit a loan with the given data."""
+    data = dict(data)
+    record_uuid = uuid.uuid4()
+    loan_pid_minter(record_uuid, data)
+    loan = Loan.create(data, id_=record_uuid)
+    db.session.commit()
+    return loan
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Benchmark scenarios.
+
+Each scenario is a function preparing its data and returning the operation
+to measure, called with the iteration number.
+"""
+
+import json
+
+from flask import url_for
+
+from invenio_circulation.api import get_loan_for_item
+from invenio_circulation.proxies import current_circulation
+
+from .app import LOCATION_PID, create_loan
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Register a scenario."""
+
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+
+    return decorator
+
+
+def _item_pid(value):
+    """Return the pid of an item."""
+    return dict(type="itemid", value=str(value))
+
+
+def _params(**kwargs):
+    """Return the parameters of an action."""
+    return dict(
+        transaction_user_pid="user_pid",
+        transaction_location_pid=LOCATION_PID,
+        patron_pid="patron_pid",
+        document_pid="document_pid",
+        pickup_location_pid=LOCATION_PID,
+        **kwargs
+    )
+
+
+def _trigger(loan, trigger, **kwargs):
+    """Trigger an action on the loan."""
+    return current_circulation.circulation.trigger(
+        loan, **_params(trigger=trigger, **kwargs)
+    )
+
+
+@scenario("loan_creation")
+def loan_creation(app, size):
+    """Create a loan."""
+
+    def run(i):
+        create_loan(dict(patron_pid="patron_pid"))
+
+    return run
+
+
+@scenario("loan_cycle")
+def loan_cycle(app, size):
+    """Request, check out, extend and check in an item."""
+
+    def run(i):
+        item_pid = _item_pid("cycle-{}".format(i))
+        loan = create_loan(dict(patron_pid="patron_pid"))
+        loan = _trigger(loan, "request", item_pid=item_pid)
+        loan = _trigger(loan, "checkout", item_pid=item_pid)
+        loan = _trigger(loan, "extend", item_pid=item_pid)
+        _trigger(loan, "next", item_pid=item_pid)
+
+    return run
+
+
+@scenario("document_request_many_items")
+def document_request_many_items(app, size):
+    """Request a document whose items are all on loan but one."""
+    items = [_item_pid("doc-{}".format(i)) for i in range(size)]
+    for item_pid in items[:-1]:
+        create_loan(
+            dict(
+                _params(state="ITEM_ON_LOAN", item_pid=item_pid),
+                start_date="2020-01-01",
+                end_date="2020-01-31",
+            )
+        )
+    app.config["CIRCULATION_ITEMS_RETRIEVER_FROM_DOCUMENT"] = lambda pid: items
+
+    def run(i):
+        loan = create_loan(dict(patron_pid="patron_pid"))
+        loan = _trigger(loan, "request")
+        assert loan["item_pid"] == items[-1]
+        _trigger(loan, "cancel", item_pid=items[-1], cancel_reason="benchmark")
+
+    return run
+
+
+@scenario("checkin_long_hold_queue")
+def checkin_long_hold_queue(app, size):
+    """Check in an item of a document with many pending requests.
+
+    Each check-in assigns the item to one of the requests, use a size larger
+    than the number of iterations to keep the queue long.
+    """
+    for i in range(size):
+        create_loan(
+            _params(
+                state="PENDING",
+                transaction_date="2020-01-01T00:00:{:02d}".format(i % 60),
+            )
+        )
+
+    def run(i):
+        item_pid = _item_pid("hold-{}".format(i))
+        loan = create_loan(dict(patron_pid="patron_pid"))
+        loan = _trigger(loan, "checkout", item_pid=item_pid)
+        _trigger(loan, "next", item_pid=item_pid)
+
+    return run
+
+
+@scenario("get_loan_for_item")
+def get_loan_for_item_scenario(app, size):
+    """Find the active loan of an item among many loans."""
+    items = [_item_pid("search-{}".format(i)) for i in range(size)]
+    for item_pid in items:
+        create_loan(
+            dict(
+                _params(state="ITEM_ON_LOAN", item_pid=item_pid),
+                start_date="2020-01-01",
+                end_date="2020-01-31",
+            )
+        )
+
+    def run(i):
+        assert get_loan_for_item(items[i % size])
+
+    return run
+
+
+@scenario("rest_checkout")
+def rest_checkout(app, size):
+    """Check out an item through the REST action endpoint."""
+    client = app.test_client()
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+
+    def run(i):
+        loan = create_loan(dict(patron_pid="patron_pid"))
+        with app.test_request_context():
+            url = url_for(
+                "invenio_circulation_loan_actions.loanid_actions",
+                pid_value=loan["pid"],
+                action="checkout",
+            )
+        data = json.dumps(_params(item_pid=_item_pid("rest-{}".format(i))))
+        response = client.post(url, headers=headers, data=data)
+        assert response.status_code == 202, response.data
+
+    return run
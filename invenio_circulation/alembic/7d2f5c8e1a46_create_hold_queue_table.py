@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create hold queue table."""
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7d2f5c8e1a46"
+down_revision = "4e9a7b1c3d25"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_table(
+        "circulation_hold_queue",
+        sa.Column("loan_id", sqlalchemy_utils.types.uuid.UUIDType(), nullable=False),
+        sa.Column("loan_pid", sa.String(length=255), nullable=False),
+        sa.Column("document_pid", sa.String(length=255), nullable=False),
+        sa.Column("queue_key", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["loan_id"],
+            ["records_metadata.id"],
+            name=op.f("fk_circulation_hold_queue_loan_id_records_metadata"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("loan_id", name=op.f("pk_circulation_hold_queue")),
+    )
+    op.create_index(
+        "ix_circulation_hold_queue_document_pid_queue_key",
+        "circulation_hold_queue",
+        ["document_pid", "queue_key", "loan_id"],
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_index(
+        "ix_circulation_hold_queue_document_pid_queue_key",
+        table_name="circulation_hold_queue",
+    )
+    op.drop_table("circulation_hold_queue")
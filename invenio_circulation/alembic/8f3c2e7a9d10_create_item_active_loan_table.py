@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create item active loan table."""
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8f3c2e7a9d10"
+down_revision = "5b1e0d5a2c41"
+branch_labels = ()
+depends_on = "862037093962"
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_table(
+        "circulation_item_active_loan",
+        sa.Column("item_pid_type", sa.String(length=255), nullable=False),
+        sa.Column("item_pid_value", sa.String(length=255), nullable=False),
+        sa.Column("loan_id", sqlalchemy_utils.types.uuid.UUIDType(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["loan_id"],
+            ["records_metadata.id"],
+            name=op.f("fk_circulation_item_active_loan_loan_id_records_metadata"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "item_pid_type",
+            "item_pid_value",
+            name=op.f("pk_circulation_item_active_loan"),
+        ),
+        sa.UniqueConstraint(
+            "loan_id", name=op.f("uq_circulation_item_active_loan_loan_id")
+        ),
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_table("circulation_item_active_loan")
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create expression indexes on the loans JSON fields."""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c2d4e6f8a1b3"
+down_revision = "8f3c2e7a9d10"
+branch_labels = ()
+depends_on = None
+
+INDEXES = {
+    "ix_circulation_loans_item_pid_value": "(json #>> '{item_pid,value}')",
+    "ix_circulation_loans_document_pid": "(json ->> 'document_pid')",
+    "ix_circulation_loans_patron_pid": "(json ->> 'patron_pid')",
+    "ix_circulation_loans_state": "(json ->> 'state')",
+}
+
+
+def upgrade():
+    """Upgrade database."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name, expression in INDEXES.items():
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS {} ON records_metadata ({})".format(
+                name, expression
+            )
+        )
+
+
+def downgrade():
+    """Downgrade database."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name in INDEXES:
+        op.execute("DROP INDEX IF EXISTS {}".format(name))
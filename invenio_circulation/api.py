@@ -8,14 +8,36 @@
 
 """Circulation API."""
 
+from itertools import islice
+
+import arrow
 from flask import current_app
+from invenio_db import db
 from invenio_jsonschemas import current_jsonschemas
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_pidstore.resolver import Resolver
 from invenio_records.api import Record
-
-from .errors import MissingRequiredParameterError, MultipleLoansOnItemError
+from invenio_records.models import RecordMetadata
+from sqlalchemy.exc import IntegrityError
+
+from .errors import (
+    ItemNotAvailableError,
+    MissingRequiredParameterError,
+    MultipleLoansOnItemError,
+)
+from .models import HoldQueueEntry, ItemActiveLoan, JobCursor
 from .pidstore.pids import CIRCULATION_LOAN_PID_TYPE
-from .search.api import search_by_patron_item_or_document, search_by_pid
+from .search.api import (
+    search_after_scan,
+    search_by_item_pids,
+    search_by_patron_item_or_document,
+    search_by_pid,
+    search_exists,
+    search_hits,
+    search_overdue_loans,
+)
+from .search.sql import loan_field, loans_query
+from .signals import loans_overdue
 from .utils import str2datetime
 
 
@@ -35,8 +57,30 @@ class Loan(Record):
     def __init__(self, data, model=None):
         """Constructor."""
         self.item_ref_builder = current_app.config["CIRCULATION_ITEM_REF_BUILDER"]
+        # string and parsed values of the date fields read in datetime mode
+        self._parsed_dates = None
         super().__init__(data, model)
 
+    def __getitem__(self, key):
+        """Get a field, parsing a date field on its first access if needed."""
+        value = super().__getitem__(key)
+        if (
+            self._parsed_dates is not None
+            and isinstance(value, str)
+            and (key in self.DATE_FIELDS or key in self.DATETIME_FIELDS)
+        ):
+            parsed = str2datetime(value)
+            self._parsed_dates[key] = (value, parsed)
+            super().__setitem__(key, parsed)
+            return parsed
+        return value
+
+    def get(self, key, default=None):
+        """Get a field, see `__getitem__`."""
+        if self._parsed_dates is None:
+            return super().get(key, default)
+        return self[key] if key in self else default
+
     @classmethod
     def build_resolver_fields(cls, data):
         """Build all resolver fields."""
@@ -58,27 +102,123 @@ class Loan(Record):
         if data.get("item_pid"):
             data["document_pid"] = get_document_pid_by_item_pid(data["item_pid"])
 
-        return super().create(data, id_=id_, **kwargs)
+        loan = super().create(data, id_=id_, **kwargs)
+        loan.sync_item_active_loan()
+        loan.sync_hold_queue()
+        return loan
 
     def update(self, *args, **kwargs):
         """Update Loan record."""
         super().update(*args, **kwargs)
         self.build_resolver_fields(self)
 
+    def commit(self, **kwargs):
+        """Store changes of the current Loan record in the database."""
+        loan = super().commit(**kwargs)
+        self.sync_item_active_loan()
+        self.sync_hold_queue()
+        return loan
+
+    def delete(self, force=False):
+        """Delete the Loan record."""
+        if current_app.config["CIRCULATION_ITEM_ACTIVE_LOAN_TABLE"]:
+            ItemActiveLoan.set_item(self.id, None)
+        if current_app.config["CIRCULATION_HOLD_QUEUE_TABLE"]:
+            HoldQueueEntry.set_loan(self.id)
+        return super().delete(force=force)
+
+    def sync_item_active_loan(self):
+        """Attach the loan to its item in the item active loan table.
+
+        The loan is detached from the item when it is not active anymore.
+        Does nothing if ``CIRCULATION_ITEM_ACTIVE_LOAN_TABLE`` is disabled.
+        """
+        config = current_app.config
+        if not config["CIRCULATION_ITEM_ACTIVE_LOAN_TABLE"]:
+            return
+        item_pid = None
+        if self.get("state") in config["CIRCULATION_STATES_LOAN_ACTIVE"]:
+            item_pid = self.get("item_pid")
+        try:
+            ItemActiveLoan.set_item(self.id, item_pid)
+        except IntegrityError:
+            raise ItemNotAvailableError(item_pid=item_pid, transition=self["state"])
+
+    def sync_hold_queue(self):
+        """Add the loan to the queue of its document while it is pending.
+
+        The loan is removed from the queue when it is not pending anymore.
+        Does nothing if ``CIRCULATION_HOLD_QUEUE_TABLE`` is disabled.
+        """
+        config = current_app.config
+        if not config["CIRCULATION_HOLD_QUEUE_TABLE"]:
+            return
+        if self.get("state") not in config["CIRCULATION_STATES_LOAN_REQUEST"]:
+            HoldQueueEntry.set_loan(self.id)
+            return
+        HoldQueueEntry.set_loan(
+            self.id,
+            loan_pid=self["pid"],
+            document_pid=self.get("document_pid"),
+            queue_key=config["CIRCULATION_HOLD_QUEUE_SORT_KEY"](self),
+        )
+
+    def snapshot(self):
+        """Return a copy-on-write snapshot of the loan.
+
+        The snapshot shares the field values and the database model with the
+        loan instead of deep copying the record. Transitions replace fields of
+        the loan, they never mutate a field value in place, therefore the
+        snapshot keeps the values that the loan had when it was taken.
+        """
+        snapshot = self.__class__(dict(self), model=self.model)
+        if self._parsed_dates is not None:
+            snapshot._parsed_dates = dict(self._parsed_dates)
+        return snapshot
+
+    def changed_fields(self, initial_loan):
+        """Return the names of the fields that differ from the initial loan.
+
+        :param initial_loan: the loan before the changes, usually a snapshot.
+        """
+        changed = set()
+        for field in set(self).union(initial_loan):
+            if field not in self or field not in initial_loan:
+                changed.add(field)
+            elif (
+                self[field] is not initial_loan[field]
+                and self[field] != initial_loan[field]
+            ):
+                changed.add(field)
+        return frozenset(changed)
+
     def date_fields2datetime(self):
-        """Convert string datetime fields to Python datetime."""
-        for field in self.DATE_FIELDS + self.DATETIME_FIELDS:
-            if field in self:
-                self[field] = str2datetime(self[field])
+        """Switch the string date fields to Python datetime.
+
+        The fields are parsed lazily, on their first access, and keep their
+        parsed value until `date_fields2str` is called.
+        """
+        if self._parsed_dates is None:
+            self._parsed_dates = {}
 
     def date_fields2str(self):
-        """Convert Python datetime fields to string."""
-        for field in self.DATE_FIELDS:
-            if field in self:
-                self[field] = self[field].date().isoformat()
-        for field in self.DATETIME_FIELDS:
-            if field in self:
-                self[field] = self[field].isoformat()
+        """Convert Python datetime fields to string.
+
+        Fields that were only read get back their original string value, only
+        the fields that were changed are formatted.
+        """
+        parsed_dates, self._parsed_dates = self._parsed_dates or {}, None
+        for field in self.DATE_FIELDS + self.DATETIME_FIELDS:
+            value = super().get(field)
+            if value is None or isinstance(value, str):
+                continue
+            string, parsed = parsed_dates.get(field, (None, None))
+            if value is parsed:
+                self[field] = string
+            elif field in self.DATE_FIELDS:
+                self[field] = value.date().isoformat()
+            else:
+                self[field] = value.isoformat()
 
     @classmethod
     def get_record_by_pid(cls, pid, with_deleted=False):
@@ -91,6 +231,39 @@ class Loan(Record):
         _, record = resolver.resolve(str(pid))
         return record
 
+    @classmethod
+    def get_records_by_pids(cls, pids, chunk_size=500):
+        """Yield the loans of the given pid values, in the same order.
+
+        The loans are fetched by chunks of `chunk_size` pids, with one query
+        to resolve the pids and one query to fetch the records of each chunk.
+        Pids that are not registered or of deleted loans are skipped.
+
+        :param pids: an iterable of loan pid values.
+        :param chunk_size: the number of loans fetched at once.
+        """
+        pids = iter(pids)
+        while True:
+            chunk = [str(pid) for pid in islice(pids, chunk_size)]
+            if not chunk:
+                return
+            uuids = dict(
+                PersistentIdentifier.query.filter(
+                    PersistentIdentifier.pid_type == CIRCULATION_LOAN_PID_TYPE,
+                    PersistentIdentifier.pid_value.in_(chunk),
+                    PersistentIdentifier.status == PIDStatus.REGISTERED,
+                ).with_entities(
+                    PersistentIdentifier.pid_value, PersistentIdentifier.object_uuid
+                )
+            )
+            records = {
+                record.id: record for record in cls.get_records(list(uuids.values()))
+            }
+            for pid in chunk:
+                record = records.get(uuids.get(pid))
+                if record is not None:
+                    yield record
+
     def update_item_ref(self, item_pid):
         """Replace item reference.
 
@@ -103,40 +276,147 @@ class Loan(Record):
         self["item_pid"] = item_pid
 
 
-def is_item_available_for_checkout(item_pid):
+def _date_property(field):
+    """Return a property parsing the given date field of a `LoanHit`."""
+
+    def getter(self):
+        value = self._dates[LoanHit.DATE_FIELDS.index(field)]
+        return str2datetime(value) if value else None
+
+    return property(getter, doc="Parsed `{}` of the loan.".format(field))
+
+
+class LoanHit(object):
+    """Read-only summary of a loan, built from a search hit or loan data.
+
+    It keeps only the fields that batch jobs and listings usually read, the
+    dates are parsed on access. Use `to_loan()` to fetch the full loan, e.g.
+    to trigger a transition.
+    """
+
+    __slots__ = (
+        "pid",
+        "state",
+        "patron_pid",
+        "document_pid",
+        "item_pid_type",
+        "item_pid_value",
+        "_dates",
+    )
+
+    DATE_FIELDS = tuple(Loan.DATE_FIELDS + Loan.DATETIME_FIELDS)
+
+    SOURCE_FIELDS = [
+        "pid",
+        "state",
+        "patron_pid",
+        "document_pid",
+        "item_pid",
+    ] + list(DATE_FIELDS)
+    """Loan fields to fetch from the search to build the hits."""
+
+    start_date = _date_property("start_date")
+    end_date = _date_property("end_date")
+    request_expire_date = _date_property("request_expire_date")
+    request_start_date = _date_property("request_start_date")
+    transaction_date = _date_property("transaction_date")
+
+    def __init__(self, data):
+        """Constructor.
+
+        :param data: a dict with the loan fields, e.g. the `_source` of a hit.
+        """
+        item_pid = data.get("item_pid") or {}
+        set_field = super().__setattr__
+        set_field("pid", data["pid"])
+        set_field("state", data.get("state"))
+        set_field("patron_pid", data.get("patron_pid"))
+        set_field("document_pid", data.get("document_pid"))
+        set_field("item_pid_type", item_pid.get("type"))
+        set_field("item_pid_value", item_pid.get("value"))
+        set_field("_dates", tuple(data.get(field) for field in self.DATE_FIELDS))
+
+    @classmethod
+    def from_hit(cls, hit):
+        """Build a loan hit from a search hit."""
+        return cls(hit.to_dict())
+
+    def __setattr__(self, name, value):
+        """Prevent changes, the loan hits are read-only."""
+        raise AttributeError("LoanHit objects are read-only.")
+
+    def __repr__(self):
+        """Return the representation of the loan hit."""
+        return "<LoanHit pid={!r} state={!r}>".format(self.pid, self.state)
+
+    @property
+    def item_pid(self):
+        """Return the item pid of the loan as a dict, None if not set."""
+        if self.item_pid_value is None:
+            return None
+        return dict(type=self.item_pid_type, value=self.item_pid_value)
+
+    def to_loan(self):
+        """Fetch the full loan."""
+        return Loan.get_record_by_pid(self.pid)
+
+
+def get_loan_hits(search):
+    """Yield a `LoanHit` for each loan matching the given search.
+
+    Only the `LoanHit.SOURCE_FIELDS` of the loans are fetched.
+    """
+    search = search.source(includes=LoanHit.SOURCE_FIELDS)
+    for hit in search.scan():
+        yield LoanHit.from_hit(hit)
+
+
+def is_item_available_for_checkout(item_pid, items_with_active_loan=None):
     """Return True if the given item is available for loan, False otherwise.
 
     :param item_pid: a dict containing `value` and `type` fields to
         uniquely identify the item.
+    :param items_with_active_loan: the `(type, value)` of the items known to
+        have an active loan, as returned by `get_items_with_active_loan`.
+        When provided, the active loans of the item are not queried.
     """
     config = current_app.config
+    # the known active loans are checked before the site callback
+    if (
+        items_with_active_loan is not None
+        and (item_pid["type"], item_pid["value"]) in items_with_active_loan
+    ):
+        return False
+
     cfg_item_can_circulate = config["CIRCULATION_POLICIES"]["checkout"].get(
         "item_can_circulate"
     )
     if not cfg_item_can_circulate(item_pid):
         return False
 
+    if items_with_active_loan is not None:
+        return True
+
+    if config["CIRCULATION_ITEM_ACTIVE_LOAN_TABLE"]:
+        return ItemActiveLoan.get_loan_id(item_pid) is None
+
     search = search_by_pid(
         item_pid=item_pid,
         filter_states=config.get("CIRCULATION_STATES_LOAN_ACTIVE"),
     )
-    search_result = search.execute()
-    return search_result.hits.total.value == 0
+    return not search_exists(search)
 
 
 def is_item_at_desk_available_for_checkout(item_pid, patron_pid):
     """Return True if the ITEM_AT_DESK is available for loan, False instead."""
     # Try first to accept the availability for given patron
-    item_exception_loans = 0
     search = search_by_patron_item_or_document(
         item_pid=item_pid,
         patron_pid=patron_pid,
         filter_states=["ITEM_AT_DESK"],
+        fields=["pid"],
     )
-    search_result = search.execute()
-    item_exception_loans = search_result.hits.total.value
-
-    if item_exception_loans == 1:
+    if len(search_hits(search, max_hits=2)) == 1:
         return True
 
     # Then use normal behaviour if it failed with patron
@@ -161,9 +441,10 @@ def get_pending_loans_by_item_pid(item_pid):
     search = search_by_pid(
         item_pid=item_pid,
         filter_states=current_app.config["CIRCULATION_STATES_LOAN_REQUEST"],
+        fields=["pid"],
     )
-    for result in search.scan():
-        yield Loan.get_record_by_pid(result["pid"])
+    pids = (result["pid"] for result in search.scan())
+    yield from Loan.get_records_by_pids(pids)
 
 
 def get_pending_loans_by_doc_pid(document_pid):
@@ -171,15 +452,90 @@ def get_pending_loans_by_doc_pid(document_pid):
     search = search_by_pid(
         document_pid=document_pid,
         filter_states=current_app.config.get("CIRCULATION_STATES_LOAN_REQUEST"),
+        fields=["pid"],
     )
-    for result in search.scan():
-        yield Loan.get_record_by_pid(result["pid"])
+    pids = (result["pid"] for result in search.scan())
+    yield from Loan.get_records_by_pids(pids)
+
+
+ITEMS_ACTIVE_LOANS_MAX_PAGE_SIZE = 1000
+"""Maximum size of the search pages of `get_items_with_active_loan`."""
+
+
+def get_items_with_active_loan(item_pids):
+    """Return the `(type, value)` of the given items having an active loan.
+
+    :param item_pids: a list of dicts containing `value` and `type` fields to
+        uniquely identify the items.
+    """
+    config = current_app.config
+    if not item_pids:
+        return set()
+
+    if config["CIRCULATION_ITEM_ACTIVE_LOAN_TABLE"]:
+        return ItemActiveLoan.get_items_with_active_loan(item_pids)
+
+    search = search_by_item_pids(
+        item_pids, filter_states=config["CIRCULATION_STATES_LOAN_ACTIVE"]
+    )
+    search = search.source(includes=["item_pid"])
+    # an item should have at most one active loan: all the hits usually fit
+    # in one page, but items with several active loans are still all found
+    page_size = min(len(item_pids) + 1, ITEMS_ACTIVE_LOANS_MAX_PAGE_SIZE)
+    hits = search_after_scan(search, page_size=page_size)
+    keys = {(item_pid["type"], item_pid["value"]) for item_pid in item_pids}
+    return {(hit.item_pid.type, hit.item_pid.value) for hit in hits} & keys
+
+
+def sync_item_active_loans():
+    """Fill the item active loan table with the active loans of the database.
+
+    The table is emptied, then each active loan is attached to its item. When
+    an item has several active loans, only the first created is attached. To
+    be run before enabling ``CIRCULATION_ITEM_ACTIVE_LOAN_TABLE``, the changes
+    are not committed.
+
+    :return: a tuple with the number of attached loans and the pids of the
+        active loans that were not attached.
+    """
+    active_states = current_app.config["CIRCULATION_STATES_LOAN_ACTIVE"]
+    query = (
+        loans_query(RecordMetadata.id, RecordMetadata.json)
+        .filter(loan_field("state").in_(active_states))
+        .order_by(RecordMetadata.created, RecordMetadata.id)
+    )
+    ItemActiveLoan.query.delete()
+    items = {}
+    not_attached = []
+    for row in query.yield_per(1000):
+        item_pid = row.json.get("item_pid")
+        key = (item_pid["type"], item_pid["value"]) if item_pid else None
+        if key is None or key in items:
+            not_attached.append(row.json.get("pid"))
+            continue
+        items[key] = row.id
+    db.session.bulk_insert_mappings(
+        ItemActiveLoan,
+        [
+            dict(item_pid_type=key[0], item_pid_value=key[1], loan_id=loan_id)
+            for key, loan_id in items.items()
+        ],
+    )
+    return len(items), not_attached
 
 
 def get_available_item_by_doc_pid(document_pid):
-    """Return an item pid available for this document."""
-    for item_pid in get_items_by_doc_pid(document_pid):
-        if is_item_available_for_checkout(item_pid):
+    """Return an item pid available for this document.
+
+    The active loans of all the items of the document are retrieved with a
+    single query, then the items are checked in order until one is available.
+    """
+    item_pids = list(get_items_by_doc_pid(document_pid))
+    items_with_active_loan = get_items_with_active_loan(item_pids)
+    for item_pid in item_pids:
+        if is_item_available_for_checkout(
+            item_pid, items_with_active_loan=items_with_active_loan
+        ):
             return item_pid
     return None
 
@@ -203,14 +559,152 @@ def get_loan_for_item(item_pid):
     if not item_pid:
         return
 
+    if current_app.config["CIRCULATION_ITEM_ACTIVE_LOAN_TABLE"]:
+        loan_id = ItemActiveLoan.get_loan_id(item_pid)
+        return Loan.get_record(loan_id) if loan_id else None
+
     search = search_by_pid(
         item_pid=item_pid,
         filter_states=current_app.config["CIRCULATION_STATES_LOAN_ACTIVE"],
+        fields=["pid"],
     )
     loan = None
-    hits = list(search.scan())
+    hits = search_hits(search, max_hits=2)
     if hits:
         if len(hits) > 1:
             raise MultipleLoansOnItemError(item_pid=item_pid)
         loan = Loan.get_record_by_pid(hits[0]["pid"])
     return loan
+
+
+OVERDUE_LOANS_JOB = "overdue-loans"
+"""Name of the overdue loans detection job cursor."""
+
+
+def detect_overdue_loans(until=None, batch_size=None):
+    """Find the loans that became overdue since the previous run.
+
+    The loans of ``CIRCULATION_STATES_LOAN_OVERDUE`` with an end date from
+    the date of the previous run until `until` (excluded) are sent by batches
+    with the `loans_overdue` signal. The date is then kept as the cursor of
+    the next run, once all the batches have been sent. The first run finds
+    all the overdue loans.
+
+    :param until: the date when the loans are overdue, today (UTC) if not set.
+    :param batch_size: the number of loans sent at once, defaults to
+        ``CIRCULATION_OVERDUE_LOANS_BATCH_SIZE``.
+    :return: the number of overdue loans found.
+    """
+    until = (until or arrow.utcnow().date()).isoformat()
+    batch_size = (
+        batch_size or current_app.config["CIRCULATION_OVERDUE_LOANS_BATCH_SIZE"]
+    )
+    since = JobCursor.get_value(OVERDUE_LOANS_JOB)
+    if since and since >= until:
+        return 0
+
+    search = search_overdue_loans(end_date_from=since, end_date_to=until)
+    search = search.source(includes=LoanHit.SOURCE_FIELDS)
+    loans = (
+        LoanHit.from_hit(hit) for hit in search_after_scan(search, page_size=batch_size)
+    )
+    count = 0
+    sender = current_app._get_current_object()
+    while True:
+        batch = list(islice(loans, batch_size))
+        if not batch:
+            break
+        loans_overdue.send(sender, loans=batch)
+        count += len(batch)
+
+    JobCursor.set_value(OVERDUE_LOANS_JOB, until)
+    db.session.commit()
+    return count
+
+
+def _sorted_pending_loans(document_pid):
+    """Return the pending loans of the document found by a search, in order."""
+    sort_key = current_app.config["CIRCULATION_HOLD_QUEUE_SORT_KEY"]
+    return sorted(
+        get_pending_loans_by_doc_pid(document_pid),
+        key=lambda loan: (sort_key(loan), str(loan.id)),
+    )
+
+
+def get_hold_queue(document_pid):
+    """Return the pids of the pending loans of the document, in queue order.
+
+    The queue is ordered with ``CIRCULATION_HOLD_QUEUE_SORT_KEY``.
+    """
+    if current_app.config["CIRCULATION_HOLD_QUEUE_TABLE"]:
+        return HoldQueueEntry.get_queue(document_pid)
+    return [loan["pid"] for loan in _sorted_pending_loans(document_pid)]
+
+
+def get_hold_queue_position(loan):
+    """Return the position, from 1, of the loan in the queue of its document.
+
+    :return: the position, None if the loan is not pending.
+    """
+    if loan.get("state") not in current_app.config["CIRCULATION_STATES_LOAN_REQUEST"]:
+        return None
+    if current_app.config["CIRCULATION_HOLD_QUEUE_TABLE"]:
+        return HoldQueueEntry.get_position(loan.id)
+
+    queue = get_hold_queue(loan["document_pid"])
+    return queue.index(loan["pid"]) + 1 if loan["pid"] in queue else None
+
+
+def iter_hold_queue(document_pid):
+    """Iterate over the pending loans of the document, in queue order.
+
+    With ``CIRCULATION_HOLD_QUEUE_TABLE`` enabled, the loans are read one by
+    one from the table, in the order of its entries. Otherwise, the pending
+    loans are searched and sorted at once.
+    """
+    if current_app.config["CIRCULATION_HOLD_QUEUE_TABLE"]:
+        for loan_id in HoldQueueEntry.get_loan_ids(document_pid):
+            yield Loan.get_record(loan_id)
+        return
+    yield from _sorted_pending_loans(document_pid)
+
+
+def sync_hold_queue():
+    """Fill the hold queue table with the pending loans of the database.
+
+    The table is emptied, then each pending loan is added to the queue of its
+    document. To be run before enabling ``CIRCULATION_HOLD_QUEUE_TABLE``, the
+    changes are not committed.
+
+    :return: the number of loans added to the queues.
+    """
+    config = current_app.config
+    sort_key = config["CIRCULATION_HOLD_QUEUE_SORT_KEY"]
+    query = loans_query(RecordMetadata).filter(
+        loan_field("state").in_(config["CIRCULATION_STATES_LOAN_REQUEST"])
+    )
+    HoldQueueEntry.query.delete()
+    entries = []
+    for model in query.yield_per(1000):
+        loan = Loan(model.json, model=model)
+        if not loan.get("document_pid"):
+            continue
+        entries.append(
+            dict(
+                loan_id=model.id,
+                loan_pid=loan["pid"],
+                document_pid=loan["document_pid"],
+                queue_key=sort_key(loan),
+            )
+        )
+    db.session.bulk_insert_mappings(HoldQueueEntry, entries)
+    return len(entries)
+
+
+def get_next_pending_loan(document_pid):
+    """Return the first pending loan in the queue of the document, if any."""
+    if current_app.config["CIRCULATION_HOLD_QUEUE_TABLE"]:
+        entry = HoldQueueEntry.get_first(document_pid)
+        return Loan.get_record(entry.loan_id) if entry else None
+
+    return next(iter_hold_queue(document_pid), None)
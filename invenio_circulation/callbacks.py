@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation configured callbacks."""
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_app_context, has_request_context
+
+
+def _freeze(value):
+    """Return a hashable version of the given callback argument."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def memoize_callback(func):
+    """Memoize the results of a configured callback.
+
+    The results are cached only in a :func:`callbacks_cache` block, keyed on
+    the callback and its arguments, e.g. the `type` and `value` of an item
+    PID. The callback is called as usual outside of a block or when its
+    arguments cannot be hashed.
+    """
+    if getattr(func, "memoized", False):
+        return func
+
+    @wraps(func)
+    def inner(*args, **kwargs):
+        cache = g.get("circulation_callbacks_cache") if has_app_context() else None
+        if cache is None:
+            return func(*args, **kwargs)
+        key = (inner, _freeze(args), _freeze(kwargs))
+        try:
+            return cache[key]
+        except KeyError:
+            result = cache[key] = func(*args, **kwargs)
+            return result
+        except TypeError:
+            # unhashable arguments
+            return func(*args, **kwargs)
+
+    inner.memoized = True
+    return inner
+
+
+@contextmanager
+def callbacks_cache():
+    """Cache the results of the memoized callbacks until the block exits.
+
+    A nested block shares the cache of the outermost block.
+    """
+    if "circulation_callbacks_cache" in g:
+        yield
+        return
+
+    g.circulation_callbacks_cache = {}
+    try:
+        yield
+    finally:
+        g.pop("circulation_callbacks_cache", None)
+
+
+class CallbacksProfile(object):
+    """Call counts and latencies of the configured callbacks of the process.
+
+    For each callback, the number of calls, the cumulative and the maximum
+    duration of a call are kept, as well as the number of requests calling
+    it and the maximum cumulative duration of its calls in a request.
+    """
+
+    FIELDS = ("calls", "total", "max", "requests", "max_per_request")
+
+    def __init__(self):
+        """Constructor."""
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        """Return the stats of a callback, created if needed."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = dict.fromkeys(self.FIELDS, 0)
+        return stats
+
+    def record_call(self, name, duration):
+        """Record a call of a callback."""
+        with self._lock:
+            stats = self._get(name)
+            stats["calls"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+
+    def record_request(self, durations):
+        """Record the cumulative durations of the callbacks called in a request.
+
+        :param durations: a dict of callback names to durations.
+        """
+        with self._lock:
+            for name, duration in durations.items():
+                stats = self._get(name)
+                stats["requests"] += 1
+                stats["max_per_request"] = max(stats["max_per_request"], duration)
+
+    def reset(self):
+        """Remove all the recorded stats."""
+        with self._lock:
+            self._stats = {}
+
+    def top(self, limit=None, sort="total"):
+        """Return the stats of the callbacks, the most expensive first.
+
+        :param limit: the number of callbacks to return, all if not set.
+        :param sort: the stats field to sort on, e.g. `max` or `calls`.
+        """
+        if sort not in self.FIELDS:
+            raise ValueError("Unknown callbacks stats field '{}'".format(sort))
+        with self._lock:
+            # a request running when the stats are reset records callbacks
+            # without calls since the reset, they are left out
+            stats = [
+                dict(stats, name=name)
+                for name, stats in self._stats.items()
+                if stats["calls"]
+            ]
+        for callback in stats:
+            callback["mean"] = callback["total"] / callback["calls"]
+        stats.sort(key=lambda callback: callback[sort], reverse=True)
+        return stats[:limit]
+
+
+def profile_callback(func, name, profile):
+    """Record the calls of a configured callback in the given profile."""
+
+    @wraps(func)
+    def inner(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            profile.record_call(name, duration)
+            if has_request_context():
+                durations = g.setdefault("circulation_callbacks_durations", {})
+                durations[name] = durations.get(name, 0) + duration
+
+    return inner
+
+
+def profile_callbacks(name, value, profile):
+    """Return the value of a setting with its callbacks profiled.
+
+    The functions of the dicts, e.g. of ``CIRCULATION_POLICIES``, are also
+    profiled and the dicts are copied. Classes are left untouched.
+    """
+    if isinstance(value, dict):
+        return {
+            key: profile_callbacks("{}.{}".format(name, key), v, profile)
+            for key, v in value.items()
+        }
+    if callable(value) and not isinstance(value, type):
+        return profile_callback(value, name, profile)
+    return value
+
+
+def record_callbacks_request(exception=None):
+    """Record the callbacks durations of the request, on request teardown."""
+    durations = g.pop("circulation_callbacks_durations", None)
+    if durations:
+        profile = current_app.extensions["invenio-circulation"].callbacks_profile
+        profile.record_request(durations)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation CLI."""
+
+import click
+from flask.cli import with_appcontext
+from invenio_db import db
+
+from .api import sync_hold_queue, sync_item_active_loans
+from .tasks import expire_loan_requests
+
+
+@click.group()
+def circulation():
+    """Circulation commands."""
+
+
+@circulation.command("expire-requests")
+@click.option(
+    "--transaction-user-pid", required=True, help="User pid of the cancellations."
+)
+@click.option(
+    "--transaction-location-pid",
+    help="Location pid of the cancellations, the loans location if not set.",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Date when the requests are expired, today if not set.",
+)
+@with_appcontext
+def expire_requests(transaction_user_pid, transaction_location_pid, until):
+    """Cancel the loans with a request expire date in the past."""
+    cancelled, failed = expire_loan_requests(
+        transaction_user_pid,
+        transaction_location_pid=transaction_location_pid,
+        until=until.date() if until else None,
+    )
+    click.secho("Expired {} loan requests.".format(cancelled), fg="green")
+    if failed:
+        click.secho("Failed to expire {} loan requests.".format(failed), fg="red")
+
+
+@circulation.command("sync-item-active-loans")
+@with_appcontext
+def sync_item_active_loans_command():
+    """Fill the item active loan table with the active loans."""
+    attached, not_attached = sync_item_active_loans()
+    db.session.commit()
+    click.secho("Attached {} active loans to their items.".format(attached), fg="green")
+    if not_attached:
+        click.secho(
+            "Active loans without item or on an item with another active loan, "
+            "not attached: {}".format(", ".join(map(str, not_attached))),
+            fg="red",
+        )
+
+
+@circulation.command("sync-hold-queue")
+@with_appcontext
+def sync_hold_queue_command():
+    """Fill the hold queue table with the pending loans."""
+    count = sync_hold_queue()
+    db.session.commit()
+    click.secho("Added {} pending loans to the hold queues.".format(count), fg="green")
@@ -39,6 +39,7 @@ from .utils import (
     get_default_extension_duration,
     get_default_extension_max_count,
     get_default_loan_duration,
+    hold_queue_sort_key,
     is_loan_duration_valid,
     item_can_circulate,
     item_exists,
@@ -72,6 +73,34 @@ CIRCULATION_STATES_LOAN_ACTIVE = [
 Items that have attached loans with these circulation statuses are
 not available to be loaned by patrons."""
 
+CIRCULATION_ITEM_ACTIVE_LOAN_TABLE = False
+"""Keep the active loan of each item in a database table.
+
+When enabled, the item availability checks are primary key lookups in the
+table instead of search queries, and the database rejects a second active
+loan on the same item. Before enabling it, fill the table with the existing
+active loans with ``invenio circulation sync-item-active-loans``.
+"""
+
+CIRCULATION_LOAN_SEARCH_BACKEND = "search"
+"""Backend of the loans searches made by the circulation API.
+
+- ``search``: query the loans with the ``search_class`` of the loans REST
+  endpoint, by default the loans index of the search cluster. Small
+  deployments and tests can set it to
+  ``invenio_circulation.search.memory:LoansMemorySearch``, together with the
+  ``invenio_circulation.search.memory:LoansMemoryIndexer`` ``indexer_class``,
+  to search the loans in the memory of the process. The memory index is only
+  consistent when a single process changes the loans.
+- ``sql``: query the loans in the records table of the database. The results
+  include the changes of the current transaction, without waiting for the
+  index refresh. On PostgreSQL, the searches use the expression indexes on
+  the item, document, patron and state of the loans.
+
+The functions of ``invenio_circulation.search.api`` also accept a ``backend``
+argument to select it per call.
+"""
+
 CIRCULATION_STATES_LOAN_COMPLETED = ["ITEM_RETURNED"]
 """Defines the list of states that a loan is considered completed.
 
@@ -81,6 +110,41 @@ refer to."""
 CIRCULATION_STATES_LOAN_CANCELLED = ["CANCELLED"]
 """Defines the list of states for which the loan is considered cancelled."""
 
+CIRCULATION_STATES_LOAN_OVERDUE = ["ITEM_ON_LOAN"]
+"""Defines the list of states for which a loan can be overdue.
+
+A loan in one of these states is overdue when its end date is past."""
+
+CIRCULATION_OVERDUE_LOANS_BATCH_SIZE = 1000
+"""Number of overdue loans sent at once with the `loans_overdue` signal."""
+
+CIRCULATION_HOLD_QUEUE_SORT_KEY = hold_queue_sort_key
+"""Function returning the sort key, a string, of a pending loan in the queue.
+
+When an item is returned, it is assigned to the first pending request of its
+document, in the order of this key. Override it e.g. to serve some patrons
+first. The keys are at most 255 characters long.
+"""
+
+CIRCULATION_HOLD_QUEUE_TABLE = False
+"""Keep the queue of the pending requests of each document in a table.
+
+When enabled, the next request of a document is an index lookup in the
+table and the position of a request counts the entries ahead of it in the
+queue, instead of sorting all the pending loans of the document. Before
+enabling it, fill the table with the existing pending loans with
+``invenio circulation sync-hold-queue``.
+"""
+
+CIRCULATION_STATES_LOAN_EXPIRABLE = ["PENDING", "ITEM_AT_DESK"]
+"""Defines the list of states for which a loan expires.
+
+A loan in one of these states is cancelled by `expire_loan_requests` when its
+request expire date is past."""
+
+CIRCULATION_EXPIRE_LOAN_REQUESTS_CHUNK_SIZE = 500
+"""Number of expired loans cancelled and committed at once."""
+
 CIRCULATION_LOAN_TRANSITIONS_DEFAULT_PERMISSION_FACTORY = allow_all
 """Default permission factory for all Loans transitions."""
 
@@ -131,6 +195,61 @@ CIRCULATION_LOAN_TRANSITIONS = {
 CIRCULATION_LOAN_INITIAL_STATE = "CREATED"
 """Define the initial state name of a Loan."""
 
+CIRCULATION_LOAN_INDEX_BUFFER = False
+"""Index the loans modified during a request with one bulk request.
+
+When enabled, the loans are not indexed one by one when committed: the index
+operations are deduplicated and sent at once at the end of the loan action,
+before the response is sent, or when the request is torn down. The loans that
+fail to be indexed are sent to the bulk indexing queue of the indexer, to be
+indexed again by ``invenio_indexer``.
+"""
+
+CIRCULATION_UNIT_OF_WORK = False
+"""Commit the changes of a loan action in a single database transaction.
+
+When enabled, the transitions executed by the REST views only flush their
+changes and the view commits once, making actions on several loans (e.g. a
+check-in updating the pending requests) atomic. The ``loan_state_changed``
+signal is then sent before the changes are committed.
+"""
+
+CIRCULATION_TRIGGER_MANY_CHUNK_SIZE = None
+"""Number of loans committed at once by `trigger_many`, all when not set."""
+
+CIRCULATION_TRANSITION_TIMING = False
+"""Measure the duration of the phases of each transition.
+
+When enabled, the ``transition_timed`` signal is sent after each transition
+with the duration and the number of SQL and search queries of its phases:
+the ``checks`` of the decorators, ``before()``, ``loan_commit``,
+``db_commit``, ``index``, the ``loan_state_changed`` ``signal`` receivers and
+the rest of ``after()``. With ``CIRCULATION_UNIT_OF_WORK``, the database
+commit and the indexing happen after the transitions and are not measured.
+
+The timings are recorded in the histograms of
+``current_circulation.transition_timings``, exposed by the
+``/circulation/metrics/transitions`` endpoint.
+"""
+
+CIRCULATION_TRANSITION_TIMING_LOG = True
+"""Log the timing of each transition as a JSON line, when enabled."""
+
+CIRCULATION_TRANSITION_TIMING_BUCKETS = [
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+]
+"""Upper bounds in seconds of the buckets of the transition timing histograms."""
+
 CIRCULATION_PATRON_EXISTS = patron_exists
 """Function that returns True if the given Patron exists."""
 
@@ -155,6 +274,31 @@ CIRCULATION_LOAN_LOCATIONS_VALIDATION = validate_item_pickup_transaction_locatio
 CIRCULATION_SAME_LOCATION_VALIDATOR = same_location_validator
 """Validates location of given item_pid and given location_pid are the same."""
 
+CIRCULATION_MEMOIZED_CALLBACKS = [
+    "CIRCULATION_PATRON_EXISTS",
+    "CIRCULATION_ITEM_EXISTS",
+    "CIRCULATION_DOCUMENT_EXISTS",
+    "CIRCULATION_ITEM_LOCATION_RETRIEVER",
+]
+"""Callbacks called at most once per PID during a loan action.
+
+The results of these functions are cached while a loan action is executed,
+therefore they must not depend on changes made by the action itself.
+"""
+
+CIRCULATION_CALLBACKS_PROFILING = False
+"""Profile the calls of the configured callbacks.
+
+When enabled, the functions of the ``CIRCULATION_*`` settings, including the
+functions of ``CIRCULATION_POLICIES``, are wrapped when the application is
+initialized to record their number of calls, their cumulative and maximum
+latency, and their maximum cumulative latency in a request. The callbacks
+changed after the initialization are not profiled.
+
+The most expensive callbacks of the process are returned by the
+``/circulation/metrics/callbacks`` endpoint.
+"""
+
 # JSON Schema resolvers
 CIRCULATION_ITEM_REF_BUILDER = item_ref_builder
 """Function that builds $ref to an `Item` record."""
@@ -224,6 +368,41 @@ CIRCULATION_REST_ENDPOINTS = dict(
 )
 """REST endpoint configuration for circulation APIs."""
 
+CIRCULATION_LOAN_EXPORT_FORMATS = {
+    "ndjson": dict(
+        mimetype="application/x-ndjson",
+        serializer="invenio_circulation.records.serializers:loans_ndjson_serializer",
+    ),
+    "csv": dict(
+        mimetype="text/csv",
+        serializer="invenio_circulation.records.serializers:loans_csv_serializer",
+    ),
+}
+"""Formats of the loans export endpoint, selected with the `format` argument.
+
+Each serializer is a function yielding the chunks of the response from an
+iterable of loan hits.
+"""
+
+CIRCULATION_LOAN_EXPORT_CSV_FIELDS = [
+    "pid",
+    "state",
+    "patron_pid",
+    "document_pid",
+    "item_pid.type",
+    "item_pid.value",
+    "pickup_location_pid",
+    "transaction_date",
+    "request_expire_date",
+    "start_date",
+    "end_date",
+    "extension_count",
+]
+"""Loan fields exported as columns in the CSV format."""
+
+CIRCULATION_LOAN_EXPORT_PAGE_SIZE = 1000
+"""Number of loans fetched per search request by the loans export endpoint."""
+
 CIRCULATION_LOAN_LINKS_FACTORY = loan_links_factory
 """Links factory for Loan record."""
 
@@ -179,3 +179,7 @@ class NotImplementedConfigurationError(CirculationException):
 
 class MissingRequiredParameterError(CirculationException):
     """Exception raised when required parameter is missing."""
+
+
+class InvalidParameterError(CirculationException):
+    """Exception raised when a parameter is not valid."""
@@ -9,6 +9,7 @@
 """Invenio module for the circulation of bibliographic items."""
 
 from copy import deepcopy
+from itertools import islice
 
 from flask import current_app
 from invenio_indexer.api import RecordIndexer
@@ -17,14 +18,29 @@ from werkzeug.utils import cached_property
 
 from . import config
 from .api import Loan
+from .callbacks import (
+    CallbacksProfile,
+    callbacks_cache,
+    memoize_callback,
+    profile_callbacks,
+    record_callbacks_request,
+)
 from .errors import (
     InvalidLoanStateError,
     NoValidTransitionAvailableError,
     TransitionConditionsFailedError,
 )
+from .indexer import flush_index_buffer
 from .pidstore.pids import CIRCULATION_LOAN_PID_TYPE
 from .search.api import LoansSearch
+from .signals import transition_timed
+from .timing import (
+    TransitionTimings,
+    log_transition_timing,
+    record_transition_timing,
+)
 from .transitions.base import Transition
+from .uow import unit_of_work
 
 
 class InvenioCirculation(object):
@@ -50,6 +66,13 @@ class InvenioCirculation(object):
         app.config.setdefault("RECORDS_REST_ENDPOINTS", {})
         app.config["RECORDS_REST_ENDPOINTS"].setdefault(CIRCULATION_LOAN_PID_TYPE, obj)
 
+        app.teardown_request(flush_index_buffer)
+
+        self.transition_timings = TransitionTimings(
+            app.config["CIRCULATION_TRANSITION_TIMING_BUCKETS"]
+        )
+        transition_timed.connect(log_transition_timing)
+        transition_timed.connect(record_transition_timing)
         app.extensions["invenio-circulation"] = self
 
     def init_config(self, app):
@@ -61,6 +84,17 @@ class InvenioCirculation(object):
         for k in dir(config):
             if k.startswith("CIRCULATION_"):
                 app.config.setdefault(k, getattr(config, k))
+        self.callbacks_profile = CallbacksProfile()
+        if app.config["CIRCULATION_CALLBACKS_PROFILING"]:
+            for k in list(app.config):
+                if k.startswith("CIRCULATION_"):
+                    app.config[k] = profile_callbacks(
+                        k, app.config[k], self.callbacks_profile
+                    )
+            app.teardown_request(record_callbacks_request)
+        for k in app.config["CIRCULATION_MEMOIZED_CALLBACKS"]:
+            if callable(app.config[k]):
+                app.config[k] = memoize_callback(app.config[k])
 
     @cached_property
     def circulation(self):
@@ -104,28 +138,82 @@ class _Circulation(object):
     def __init__(self, transitions_config):
         """Constructor."""
         self.transitions = {}
+        self.transitions_by_trigger = {}
+        self.triggers_by_state = {}
         for src_state, transitions in transitions_config.items():
             self.transitions.setdefault(src_state, [])
+            self.triggers_by_state.setdefault(src_state, [])
             for t in transitions:
                 _cls = t.pop("transition", Transition)
                 instance = _cls(**dict(t, src=src_state))
                 self.transitions[src_state].append(instance)
+                # index transitions by (state, trigger), keeping the configured
+                # order, so that only the candidates of an action are executed
+                key = (src_state, instance.trigger)
+                self.transitions_by_trigger.setdefault(key, []).append(instance)
+                if instance.trigger not in self.triggers_by_state[src_state]:
+                    self.triggers_by_state[src_state].append(instance.trigger)
 
     def _validate_current_state(self, state):
         """Validate that the given loan state is configured."""
         if not state or state not in self.transitions:
             raise InvalidLoanStateError(state=state)
 
+    def get_transitions(self, state, trigger="next"):
+        """Return the transitions configured for the given state and trigger."""
+        return self.transitions_by_trigger.get((state, trigger), [])
+
+    def get_triggers(self, state):
+        """Return the triggers of the transitions available in the given state."""
+        return self.triggers_by_state.get(state, [])
+
     def trigger(self, loan, **kwargs):
         """Trigger the action to transit a Loan to the next state."""
         current_state = loan.get("state")
         self._validate_current_state(current_state)
 
-        for t in self.transitions[current_state]:
-            try:
-                t.execute(loan, **kwargs)
-                return loan
-            except TransitionConditionsFailedError:
-                pass
+        candidates = self.get_transitions(current_state, kwargs.get("trigger", "next"))
+        with callbacks_cache():
+            for t in candidates:
+                try:
+                    t.execute(loan, **kwargs)
+                    return loan
+                except TransitionConditionsFailedError:
+                    pass
 
         raise NoValidTransitionAvailableError(loan_pid=loan["pid"], state=current_state)
+
+    def trigger_many(self, requests, chunk_size=None):
+        """Trigger the actions of many loans in one database transaction.
+
+        Each action is executed in a savepoint so that a failing action does
+        not affect the others. The loans are committed together, or per chunk
+        of `chunk_size` loans, and indexed with one bulk request per commit.
+
+        :param requests: an iterable of ``(loan, kwargs)`` tuples, where
+            `kwargs` are the parameters of :meth:`trigger` for the loan.
+        :param chunk_size: the number of loans to commit at once. Defaults to
+            ``CIRCULATION_TRIGGER_MANY_CHUNK_SIZE``, all loans when not set.
+        :return: a list of ``(loan, error)`` tuples in the order of the
+            requests, `error` is None when the action succeeded. The loan of
+            a failed action is reloaded from the database.
+        """
+        chunk_size = (
+            chunk_size or current_app.config["CIRCULATION_TRIGGER_MANY_CHUNK_SIZE"]
+        )
+        requests = iter(requests)
+        results = []
+        while True:
+            chunk = list(islice(requests, chunk_size))
+            if not chunk:
+                return results
+            with unit_of_work() as uow:
+                for loan, kwargs in chunk:
+                    try:
+                        with uow.savepoint():
+                            self.trigger(loan, **kwargs)
+                    except Exception as error:
+                        # the loan may have been changed before the failure
+                        results.append((loan.get_record(loan.id), error))
+                    else:
+                        results.append((loan, None))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation loans indexing."""
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context
+from invenio_db import db
+from invenio_search.engine import search
+from invenio_search.utils import build_alias_name
+
+from .proxies import current_circulation
+
+
+class LoanIndexBuffer(object):
+    """Loans to index, deduplicated and sent with a single bulk request."""
+
+    def __init__(self):
+        """Constructor."""
+        self._loans = {}
+
+    def add(self, loan):
+        """Add a committed loan to the buffer."""
+        self._loans[loan.id] = loan
+
+    def flush(self):
+        """Bulk index the buffered loans and empty the buffer."""
+        loans, self._loans = list(self._loans.values()), {}
+        return index_loans_or_queue(loans)
+
+
+def _index_action(indexer, loan):
+    """Return the bulk index action of a loan, from the loan in memory.
+
+    `RecordIndexer` only builds the bulk actions of records fetched again from
+    the database: its internal helpers preparing the document are used here,
+    the only place depending on them. ``test_index_action`` checks that the
+    actions are the ones of the indexer.
+    """
+    index = indexer.record_to_index(loan)
+    arguments = {}
+    body = indexer._prepare_record(loan, index, arguments)
+    action = {
+        "_op_type": "index",
+        "_index": build_alias_name(index),
+        "_id": str(loan.id),
+        "_version": loan.revision_id,
+        "_version_type": indexer._version_type,
+        "_source": body,
+    }
+    action.update(arguments)
+    return action
+
+
+def bulk_index_loans(loans):
+    """Index the given loans with a single bulk request.
+
+    The loans must have already been committed to the database. The indexed
+    documents are built from the given loans, without fetching them again.
+
+    :param loans: an iterable of Loan records.
+    :return: a tuple with the number of indexed loans and the list of the ids
+        of the loans that failed to be indexed.
+    """
+    indexer = current_circulation.loan_indexer()
+    if hasattr(indexer, "bulk_index_loans"):
+        # indexers not using the search cluster, e.g. `LoansMemoryIndexer`
+        return indexer.bulk_index_loans(loans)
+    loans = list(loans)
+    if not loans:
+        return 0, []
+    # reload the models expired by the commit with a single query, reading
+    # the ids from the identities since `loan.id` would reload each of them
+    model_cls = current_circulation.loan_record_cls.model_cls
+    ids = [sa.inspect(loan.model).identity[0] for loan in loans]
+    db.session.query(model_cls).filter(model_cls.id.in_(ids)).all()
+    actions = [_index_action(indexer, loan) for loan in loans]
+    indexed, errors = search.helpers.bulk(indexer.client, actions, raise_on_error=False)
+    failed = [error[op]["_id"] for error in errors for op in error]
+    return indexed, failed
+
+
+def index_loans_or_queue(loans):
+    """Bulk index the loans, queueing the failed ones to be indexed again.
+
+    The loans that failed to be indexed, or all of them when the bulk request
+    failed, are sent to the bulk indexing queue of the loans indexer.
+
+    :return: the list of the ids of the queued loans.
+    """
+    loans = list(loans)
+    try:
+        _, failed = bulk_index_loans(loans)
+    except Exception:
+        current_app.logger.exception("Failed to bulk index the loans.")
+        failed = [str(loan.id) for loan in loans]
+    if failed:
+        current_app.logger.warning(
+            "Queued %d loans to be indexed again: %s", len(failed), failed
+        )
+        current_circulation.loan_indexer().bulk_index(failed)
+    return failed
+
+
+def get_index_buffer():
+    """Return the index buffer of the current request, if enabled."""
+    if not has_request_context():
+        return None
+    if not current_app.config["CIRCULATION_LOAN_INDEX_BUFFER"]:
+        return None
+    if "circulation_index_buffer" not in g:
+        g.circulation_index_buffer = LoanIndexBuffer()
+    return g.circulation_index_buffer
+
+
+def flush_index_buffer(exception=None):
+    """Index the loans buffered during the request.
+
+    It is called by the loan actions before sending the response, and on
+    request teardown for the loans committed outside of an action.
+    """
+    buffer = g.pop("circulation_index_buffer", None)
+    if buffer is not None:
+        buffer.flush()
+
+
+def index_loan(loan):
+    """Index the committed loan, or buffer it until the end of the action."""
+    buffer = get_index_buffer()
+    if buffer is None:
+        current_circulation.loan_indexer().index(loan)
+    else:
+        buffer.add(loan)
+
+
+def index_loans(loans):
+    """Bulk index the committed loans, or buffer them like `index_loan`."""
+    buffer = get_index_buffer()
+    if buffer is None:
+        return index_loans_or_queue(loans)
+    for loan in loans:
+        buffer.add(loan)
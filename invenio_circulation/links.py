@@ -8,20 +8,52 @@
 
 """Links for record serialization."""
 
-from flask import current_app
+import re
+from collections import namedtuple
+
+from flask import g, has_request_context, request
 
 from .api import Loan
+from .proxies import current_circulation
 from .views import build_url_action_for_pid
 
+_PID_VALUE_PLACEHOLDER = "__pid_value__"
+
+_SAFE_PID_VALUE_REGEX = re.compile(r"^[A-Za-z0-9._~-]+$")
+"""PID values that are never escaped in URLs."""
+
+_TemplatePID = namedtuple("_TemplatePID", ["pid_type", "pid_value"])
+
+
+def _action_url_template(pid_type, action):
+    """Return the URL of an action, split around the PID value.
+
+    The templates are built once per application context and URL root.
+    """
+    templates = g.setdefault("circulation_action_url_templates", {})
+    url_root = request.url_root if has_request_context() else None
+    key = (pid_type, action, url_root)
+    if key not in templates:
+        pid = _TemplatePID(pid_type, _PID_VALUE_PLACEHOLDER)
+        url = build_url_action_for_pid(pid, action)
+        templates[key] = url.split(_PID_VALUE_PLACEHOLDER, 1)
+    return templates[key]
+
+
+def build_url_action(pid, action):
+    """Build the URL of a loan action, from a template when possible."""
+    if not _SAFE_PID_VALUE_REGEX.match(pid.pid_value):
+        return build_url_action_for_pid(pid, action)
+    prefix, suffix = _action_url_template(pid.pid_type, action)
+    return prefix + pid.pid_value + suffix
+
 
 def loan_links_factory(pid, record=None):
     """Generate links for loan."""
     links = {}
     record = record or Loan.get_record_by_pid(pid.pid_value)
     actions = {}
-    transitions_config = current_app.config.get("CIRCULATION_LOAN_TRANSITIONS", {})
-    for transition in transitions_config.get(record["state"]):
-        action = transition.get("trigger", "next")
-        actions[action] = build_url_action_for_pid(pid, action)
+    for action in current_circulation.circulation.get_triggers(record["state"]):
+        actions[action] = build_url_action(pid, action)
     links.setdefault("actions", actions)
     return links
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation database models."""
+
+from invenio_db import db
+from invenio_records.models import RecordMetadata
+from sqlalchemy_utils.types import UUIDType
+
+
+class ItemActiveLoan(db.Model):
+    """Active loan of an item.
+
+    Each item can be attached to at most one active loan: the primary key on
+    the item PID rejects a second active loan on the same item.
+    """
+
+    __tablename__ = "circulation_item_active_loan"
+
+    item_pid_type = db.Column(db.String(255), primary_key=True)
+    """Type of the item PID."""
+
+    item_pid_value = db.Column(db.String(255), primary_key=True)
+    """Value of the item PID."""
+
+    loan_id = db.Column(
+        UUIDType,
+        db.ForeignKey(RecordMetadata.id, ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    """Record identifier of the active loan."""
+
+    @classmethod
+    def get_loan_id(cls, item_pid):
+        """Return the record identifier of the active loan of the item, if any.
+
+        :param item_pid: a dict containing `value` and `type` fields to
+            uniquely identify the item.
+        """
+        row = cls.query.get((item_pid["type"], item_pid["value"]))
+        return row.loan_id if row else None
+
+    @classmethod
+    def get_items_with_active_loan(cls, item_pids):
+        """Return the `(type, value)` of the given items having an active loan.
+
+        :param item_pids: a list of dicts containing `value` and `type` fields
+            to uniquely identify the items.
+        """
+        keys = {(item_pid["type"], item_pid["value"]) for item_pid in item_pids}
+        if not keys:
+            return set()
+        rows = cls.query.filter(
+            db.tuple_(cls.item_pid_type, cls.item_pid_value).in_(sorted(keys))
+        ).with_entities(cls.item_pid_type, cls.item_pid_value)
+        return {(row[0], row[1]) for row in rows}
+
+    @classmethod
+    def set_item(cls, loan_id, item_pid):
+        """Attach the active loan to the item, or detach the loan if no item.
+
+        :param loan_id: the record identifier of the loan.
+        :param item_pid: a dict containing `value` and `type` fields to
+            uniquely identify the item, or None if the loan is not active.
+        :raises IntegrityError: if the item has another active loan.
+        """
+        row = cls.query.filter_by(loan_id=loan_id).one_or_none()
+        with db.session.begin_nested():
+            if not item_pid:
+                if row:
+                    db.session.delete(row)
+            elif row:
+                row.item_pid_type = item_pid["type"]
+                row.item_pid_value = item_pid["value"]
+            else:
+                db.session.add(
+                    cls(
+                        item_pid_type=item_pid["type"],
+                        item_pid_value=item_pid["value"],
+                        loan_id=loan_id,
+                    )
+                )
+
+
+class JobCursor(db.Model):
+    """Position reached by a periodic circulation job, e.g. a date.
+
+    The next run of the job only processes the loans after the cursor.
+    """
+
+    __tablename__ = "circulation_job_cursor"
+
+    name = db.Column(db.String(255), primary_key=True)
+    """Name of the job."""
+
+    value = db.Column(db.String(255), nullable=False)
+    """Position reached by the last run of the job."""
+
+    @classmethod
+    def get_value(cls, name):
+        """Return the cursor of the given job, None if it never ran."""
+        row = cls.query.get(name)
+        return row.value if row else None
+
+    @classmethod
+    def set_value(cls, name, value):
+        """Set the cursor of the given job."""
+        row = cls.query.get(name)
+        if row:
+            row.value = value
+        else:
+            db.session.add(cls(name=name, value=value))
+
+
+class HoldQueueEntry(db.Model):
+    """Pending request in the queue of a document.
+
+    The entries of a document are ordered by their queue key, computed with
+    ``CIRCULATION_HOLD_QUEUE_SORT_KEY``, then by loan identifier.
+    """
+
+    __tablename__ = "circulation_hold_queue"
+    __table_args__ = (
+        db.Index(
+            "ix_circulation_hold_queue_document_pid_queue_key",
+            "document_pid",
+            "queue_key",
+            "loan_id",
+        ),
+    )
+
+    loan_id = db.Column(
+        UUIDType,
+        db.ForeignKey(RecordMetadata.id, ondelete="CASCADE"),
+        primary_key=True,
+    )
+    """Record identifier of the pending loan."""
+
+    loan_pid = db.Column(db.String(255), nullable=False)
+    """PID value of the pending loan."""
+
+    document_pid = db.Column(db.String(255), nullable=False)
+    """PID value of the requested document."""
+
+    queue_key = db.Column(db.String(255), nullable=False)
+    """Sort key of the loan in the queue of the document."""
+
+    @classmethod
+    def set_loan(cls, loan_id, loan_pid=None, document_pid=None, queue_key=None):
+        """Add or move the loan in the queue, or remove it if no document.
+
+        :param loan_id: the record identifier of the loan.
+        :param document_pid: the requested document, None if the loan is not
+            pending anymore.
+        """
+        row = cls.query.get(loan_id)
+        with db.session.begin_nested():
+            if not document_pid:
+                if row:
+                    db.session.delete(row)
+            elif row:
+                row.loan_pid = loan_pid
+                row.document_pid = document_pid
+                row.queue_key = queue_key
+            else:
+                db.session.add(
+                    cls(
+                        loan_id=loan_id,
+                        loan_pid=loan_pid,
+                        document_pid=document_pid,
+                        queue_key=queue_key,
+                    )
+                )
+
+    @classmethod
+    def _ordered(cls, query):
+        """Order the given query in the queue order."""
+        return query.order_by(cls.queue_key, cls.loan_id)
+
+    @classmethod
+    def get_queue(cls, document_pid):
+        """Return the loan pids of the queue of the document, in order."""
+        query = cls._ordered(cls.query.filter_by(document_pid=document_pid))
+        return [row.loan_pid for row in query.with_entities(cls.loan_pid)]
+
+    @classmethod
+    def get_loan_ids(cls, document_pid):
+        """Return the loan ids of the queue of the document, in order."""
+        query = cls._ordered(cls.query.filter_by(document_pid=document_pid))
+        return [row.loan_id for row in query.with_entities(cls.loan_id)]
+
+    @classmethod
+    def get_first(cls, document_pid):
+        """Return the first entry of the queue of the document, if any."""
+        query = cls.query.filter_by(document_pid=document_pid)
+        return cls._ordered(query).first()
+
+    @classmethod
+    def get_position(cls, loan_id):
+        """Return the position, from 1, of the loan in its queue, if any."""
+        row = cls.query.get(loan_id)
+        if not row:
+            return None
+        ahead = cls.query.filter(
+            cls.document_pid == row.document_pid,
+            db.or_(
+                cls.queue_key < row.queue_key,
+                db.and_(cls.queue_key == row.queue_key, cls.loan_id < row.loan_id),
+            ),
+        ).count()
+        return ahead + 1
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# invenio-circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation loans export serializers."""
+
+import csv
+import io
+import json
+
+from flask import current_app
+
+
+def _get_field(data, path):
+    """Return the value at the given dotted path of the loan, if any."""
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def loans_ndjson_serializer(hits):
+    """Yield one JSON document per line for each loan hit."""
+    for hit in hits:
+        yield json.dumps(hit.to_dict()) + "\n"
+
+
+def loans_csv_serializer(hits):
+    """Yield a CSV header and one row for each loan hit.
+
+    The columns are the fields of ``CIRCULATION_LOAN_EXPORT_CSV_FIELDS``.
+    """
+    fields = current_app.config["CIRCULATION_LOAN_EXPORT_CSV_FIELDS"]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(fields)
+    yield flush()
+    for hit in hits:
+        data = hit.to_dict()
+        writer.writerow([_get_field(data, field) for field in fields])
+        yield flush()
@@ -8,11 +8,14 @@
 
 """Circulation search API."""
 
+from flask import current_app
 from invenio_search.api import RecordsSearch
 
 from invenio_circulation.errors import MissingRequiredParameterError
 
 from ..proxies import current_circulation
+from ..timing import count_query
+from .sql import LoansSQLSearch
 
 
 class LoansSearch(RecordsSearch):
@@ -28,6 +31,55 @@ class LoansSearch(RecordsSearch):
         """Add method `exclude` to old elastic search versions."""
         return super().exclude(*args, **kwargs)
 
+    def count(self):
+        """Return the number of matching loans."""
+        count_query("search")
+        return super().count()
+
+    def execute(self, *args, **kwargs):
+        """Execute the search and return the response."""
+        count_query("search")
+        return super().execute(*args, **kwargs)
+
+    def scan(self):
+        """Iterate over all the matching loans."""
+        count_query("search")
+        return super().scan()
+
+
+def _loan_search(backend=None):
+    """Return a new loans search on the given or the configured backend.
+
+    :param backend: `search` to query the search cluster, `sql` to query the
+        records table, `CIRCULATION_LOAN_SEARCH_BACKEND` when not set.
+    """
+    backend = backend or current_app.config["CIRCULATION_LOAN_SEARCH_BACKEND"]
+    if backend == "sql":
+        return LoansSQLSearch()
+    if backend == "search":
+        return current_circulation.loan_search_cls()
+    raise ValueError("Unknown loans search backend '{}'".format(backend))
+
+
+def search_exists(search):
+    """Return True if the given search matches at least one loan.
+
+    No hits are fetched, the search stops at the first match on each shard
+    and the total is not counted beyond 1.
+    """
+    search = search.extra(size=0, terminate_after=1, track_total_hits=1)
+    return search.execute().hits.total.value > 0
+
+
+def search_hits(search, max_hits=2):
+    """Return at most `max_hits` hits of the given search.
+
+    Unlike `scan()`, no scroll context is opened and the total is not counted,
+    which makes it suitable for searches expecting very few results.
+    """
+    search = search.extra(track_total_hits=False)[:max_hits]
+    return list(search.execute())
+
 
 def search_by_pid(
     item_pid=None,
@@ -36,10 +88,16 @@ def search_by_pid(
     exclude_states=None,
     sort_by_field=None,
     sort_order="asc",
+    fields=None,
+    backend=None,
 ):
-    """Retrieve loans attached to the given item or document."""
-    search_cls = current_circulation.loan_search_cls
-    search = search_cls()
+    """Retrieve loans attached to the given item or document.
+
+    :param fields: the list of loan fields to return in each hit, all the
+        fields when not set.
+    :param backend: the search backend, see `CIRCULATION_LOAN_SEARCH_BACKEND`.
+    """
+    search = _loan_search(backend)
 
     if document_pid:
         search = search.filter("term", document_pid=document_pid)
@@ -62,15 +120,47 @@ def search_by_pid(
     if sort_by_field:
         search = search.sort({sort_by_field: {"order": sort_order}})
 
+    if fields is not None:
+        search = search.source(includes=fields)
+
+    return search
+
+
+def search_by_item_pids(item_pids, filter_states=None, backend=None):
+    """Retrieve loans attached to any of the given items.
+
+    :param item_pids: a list of dicts containing `value` and `type` fields to
+        uniquely identify the items.
+    :param backend: the search backend, see `CIRCULATION_LOAN_SEARCH_BACKEND`.
+    """
+    search = _loan_search(backend).filter(
+        "terms", item_pid__value=list({item_pid["value"] for item_pid in item_pids})
+    )
+    search = search.filter(
+        "terms", item_pid__type=list({item_pid["type"] for item_pid in item_pids})
+    )
+
+    if filter_states:
+        search = search.filter("terms", state=filter_states)
+
     return search
 
 
 def search_by_patron_item_or_document(
-    patron_pid, item_pid=None, document_pid=None, filter_states=None
+    patron_pid,
+    item_pid=None,
+    document_pid=None,
+    filter_states=None,
+    fields=None,
+    backend=None,
 ):
-    """Retrieve loans for patron given an item."""
-    search_cls = current_circulation.loan_search_cls
-    search = search_cls().filter("term", patron_pid=patron_pid)
+    """Retrieve loans for patron given an item.
+
+    :param fields: the list of loan fields to return in each hit, all the
+        fields when not set.
+    :param backend: the search backend, see `CIRCULATION_LOAN_SEARCH_BACKEND`.
+    """
+    search = _loan_search(backend).filter("term", patron_pid=patron_pid)
 
     if item_pid:
         search = search.filter("term", item_pid__value=item_pid["value"]).filter(
@@ -82,6 +172,9 @@ def search_by_patron_item_or_document(
     if filter_states:
         search = search.filter("terms", state=filter_states)
 
+    if fields is not None:
+        search = search.source(includes=fields)
+
     return search
 
 
@@ -90,3 +183,79 @@ def search_by_patron_pid(patron_pid):
     search_cls = current_circulation.loan_search_cls
     search = search_cls().filter("term", patron_pid=patron_pid)
     return search
+
+
+def search_after_scan(search, sort_field="pid", page_size=1000):
+    """Iterate over all the hits of the given search, page by page.
+
+    Unlike `scan()`, no scroll context is kept open on the cluster: each page
+    is a new search starting after the last hit of the previous page, sorted
+    on the unique `sort_field`. Only one page is held in memory at a time.
+    """
+    search = search.sort(sort_field).extra(track_total_hits=False)
+    search_after = None
+    while True:
+        page = search.extra(size=page_size)
+        if search_after is not None:
+            page = page.extra(search_after=search_after)
+        hits = list(page.execute())
+        for hit in hits:
+            yield hit
+        if len(hits) < page_size:
+            return
+        search_after = list(hits[-1].meta.sort)
+
+
+def search_loans_for_export(
+    state=None, patron_pid=None, document_pid=None, item_pid=None, date_ranges=None
+):
+    """Retrieve the loans to export, matching all the given filters.
+
+    :param state: a list of loan states.
+    :param item_pid: a dict containing `value` and `type` fields to
+        uniquely identify the item.
+    :param date_ranges: a dict of loan date fields to a dict of range
+        operators, e.g. ``{"start_date": {"gte": "2020-01-01"}}``.
+    """
+    search = current_circulation.loan_search_cls()
+    if state:
+        search = search.filter("terms", state=state)
+    if patron_pid:
+        search = search.filter("term", patron_pid=patron_pid)
+    if document_pid:
+        search = search.filter("term", document_pid=document_pid)
+    if item_pid:
+        search = search.filter("term", item_pid__value=item_pid["value"]).filter(
+            "term", item_pid__type=item_pid["type"]
+        )
+    for field, bounds in (date_ranges or {}).items():
+        search = search.filter("range", **{field: bounds})
+    return search
+
+
+def search_overdue_loans(end_date_from=None, end_date_to=None):
+    """Retrieve the loans that can be overdue ending in the given range.
+
+    :param end_date_from: the earliest end date, included, if any.
+    :param end_date_to: the end date limit, excluded, e.g. today.
+    """
+    states = current_app.config["CIRCULATION_STATES_LOAN_OVERDUE"]
+    search = current_circulation.loan_search_cls().filter("terms", state=states)
+    bounds = {}
+    if end_date_from:
+        bounds["gte"] = end_date_from
+    if end_date_to:
+        bounds["lt"] = end_date_to
+    if bounds:
+        search = search.filter("range", end_date=bounds)
+    return search
+
+
+def search_expired_loans(state, request_expire_date_to):
+    """Retrieve the loans in the given state with an expired request.
+
+    :param state: the loan state.
+    :param request_expire_date_to: the expire date limit, excluded, e.g. today.
+    """
+    search = current_circulation.loan_search_cls().filter("term", state=state)
+    return search.filter("range", request_expire_date=dict(lt=request_expire_date_to))
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation loans search in memory, without a search cluster."""
+
+import threading
+from copy import copy, deepcopy
+
+from flask import current_app
+from invenio_records.models import RecordMetadata
+from invenio_search.engine import dsl
+
+from ..proxies import current_circulation
+from ..timing import count_query
+from .sql import LoansSQLResponse, loans_query
+
+
+def _value(data, field):
+    """Return the value of a loan field, e.g. `item_pid__value`."""
+    for key in field.replace(".", "__").split("__"):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _term(value):
+    """Return the term matched by a `term` or `terms` query."""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return str(value)
+
+
+class LoansMemoryIndex(object):
+    """Loans indexed in memory, with inverted indexes on the searched fields.
+
+    Each process has its own index, loaded from the database on first use
+    and updated by :class:`LoansMemoryIndexer`: the loans changed by another
+    process are not seen.
+    """
+
+    INDEXED_FIELDS = (
+        "state",
+        "item_pid__value",
+        "item_pid__type",
+        "document_pid",
+        "patron_pid",
+    )
+
+    def __init__(self):
+        """Constructor."""
+        self._loans = {}
+        self._index = {field: {} for field in self.INDEXED_FIELDS}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of indexed loans."""
+        return len(self._loans)
+
+    def load(self):
+        """Index all the loans of the database."""
+        query = loans_query(RecordMetadata.id, RecordMetadata.json)
+        for row in query.yield_per(1000):
+            self.add(str(row.id), row.json)
+
+    def _unindex(self, id_):
+        """Remove a loan from the inverted indexes."""
+        data = self._loans.pop(id_, None)
+        if data is None:
+            return
+        for field, index in self._index.items():
+            term = _term(_value(data, field))
+            ids = index.get(term)
+            if ids is not None:
+                ids.discard(id_)
+                if not ids:
+                    del index[term]
+
+    def add(self, id_, data):
+        """Index the data of the loan with the given record id."""
+        data = deepcopy(data)
+        with self._lock:
+            self._unindex(id_)
+            self._loans[id_] = data
+            for field, index in self._index.items():
+                term = _term(_value(data, field))
+                if term is not None:
+                    index.setdefault(term, set()).add(id_)
+
+    def remove(self, id_):
+        """Remove the loan with the given record id."""
+        with self._lock:
+            self._unindex(id_)
+
+    def get(self, id_):
+        """Return the indexed data of a loan, if any."""
+        return self._loans.get(id_)
+
+    def ids(self, field=None, terms=None):
+        """Return the ids of the loans, having one of the terms if given."""
+        with self._lock:
+            if field is None:
+                return set(self._loans)
+            index = self._index[field]
+            ids = set()
+            for term in terms:
+                ids.update(index.get(term, ()))
+            return ids
+
+
+def current_loans_memory_index():
+    """Return the loans memory index of the current application."""
+    index = current_app.extensions.get("invenio-circulation-loans-memory")
+    if index is None:
+        index = LoansMemoryIndex()
+        index.load()
+        current_app.extensions["invenio-circulation-loans-memory"] = index
+    return index
+
+
+class LoansMemoryIndexer(object):
+    """Indexer of the loans in the memory index of the process.
+
+    To be used with :class:`LoansMemorySearch`, as the ``indexer_class`` of
+    the loans REST endpoint.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Constructor, the arguments of `RecordIndexer` are ignored."""
+
+    def index(self, record, **kwargs):
+        """Index a loan."""
+        current_loans_memory_index().add(str(record.id), record.model.json)
+
+    def bulk_index_loans(self, loans):
+        """Index the given loans.
+
+        :return: a tuple with the number of indexed loans and the ids of the
+            failed loans, like `invenio_circulation.indexer.bulk_index_loans`.
+        """
+        count = 0
+        for loan in loans:
+            self.index(loan)
+            count += 1
+        return count, []
+
+    def bulk_index(self, record_id_iterator):
+        """Index the loans with the given record ids."""
+        record_cls = current_circulation.loan_record_cls
+        for record_id in record_id_iterator:
+            self.index(record_cls.get_record(record_id))
+
+    def delete(self, record, **kwargs):
+        """Remove a loan from the index."""
+        self.delete_by_id(record.id)
+
+    def delete_by_id(self, record_uuid, **kwargs):
+        """Remove the loan with the given record id from the index."""
+        current_loans_memory_index().remove(str(record_uuid))
+
+
+class LoansMemorySearch(object):
+    """Loans search in the memory index of the process.
+
+    It supports the same subset of the search DSL as
+    :class:`invenio_circulation.search.sql.LoansSQLSearch`, and `search_after`
+    pagination. The ``term`` and ``terms`` queries on the state, item,
+    document and patron of the loans are resolved with the inverted indexes.
+
+    To be used with :class:`LoansMemoryIndexer`, as the ``search_class`` of
+    the loans REST endpoint. The loans list of the REST API still requires
+    the search cluster.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._filters = []
+        self._sort = []
+        self._source = None
+        self._offset = 0
+        self._limit = None
+        self._track_total_hits = True
+        self._search_after = None
+
+    def _clone(self):
+        """Return a copy of the search."""
+        search = copy(self)
+        search._filters = list(self._filters)
+        search._sort = list(self._sort)
+        return search
+
+    @staticmethod
+    def _condition(name, **kwargs):
+        """Return the `(field, terms, predicate)` of a query."""
+        ((field, value),) = kwargs.items()
+        field = field.replace(".", "__")
+        if name == "term":
+            terms = {str(value)}
+        elif name == "terms":
+            terms = {str(v) for v in value}
+        elif name == "range":
+            operators = dict(gt="__gt__", gte="__ge__", lt="__lt__", lte="__le__")
+            bounds = [(operators[op], str(bound)) for op, bound in value.items()]
+
+            def predicate(data):
+                value = _value(data, field)
+                if value is None:
+                    return False
+                value = str(value)
+                return all(getattr(value, op)(bound) for op, bound in bounds)
+
+            return field, None, predicate
+        else:
+            raise ValueError("Unsupported query '{}'".format(name))
+        return field, terms, lambda data: _term(_value(data, field)) in terms
+
+    def filter(self, name, **kwargs):
+        """Return a search matching the given query."""
+        search = self._clone()
+        search._filters.append((False,) + self._condition(name, **kwargs))
+        return search
+
+    def exclude(self, name, **kwargs):
+        """Return a search not matching the given query."""
+        search = self._clone()
+        search._filters.append((True,) + self._condition(name, **kwargs))
+        return search
+
+    def sort(self, *keys):
+        """Return a search sorted by the given fields."""
+        search = self._clone()
+        for key in keys:
+            if isinstance(key, dict):
+                ((field, options),) = key.items()
+                order = options.get("order", "asc")
+            else:
+                field, order = key.lstrip("-"), "desc" if key[0] == "-" else "asc"
+            search._sort.append((field.replace(".", "__"), order == "desc"))
+        return search
+
+    def source(self, includes=None, **kwargs):
+        """Return a search returning only the given fields of the loans."""
+        search = self._clone()
+        search._source = includes
+        return search
+
+    def extra(self, size=None, track_total_hits=None, search_after=None, **kwargs):
+        """Return a search with the given size, total and pagination options."""
+        search = self._clone()
+        if size is not None:
+            search._limit = size
+        if track_total_hits is not None:
+            search._track_total_hits = track_total_hits
+        if search_after is not None:
+            search._search_after = list(search_after)
+        return search
+
+    def params(self, **kwargs):
+        """Return the search, the search parameters are ignored."""
+        return self
+
+    def __getitem__(self, key):
+        """Return a search paginated with the given slice."""
+        search = self._clone()
+        search._offset = key.start or 0
+        if key.stop is not None:
+            search._limit = key.stop - search._offset
+        return search
+
+    def _sort_values(self, data):
+        """Return the values of the sort fields of a loan."""
+        return [_value(data, field) for field, _ in self._sort]
+
+    def _is_after(self, data):
+        """Return True if the loan is sorted after the `search_after` values."""
+        values = self._sort_values(data)
+        for (_, desc), value, after in zip(self._sort, values, self._search_after):
+            if value == after:
+                continue
+            # missing values are sorted last, in both orders
+            if value is None or after is None:
+                return value is None
+            return value < after if desc else value > after
+        return False
+
+    def _matches(self):
+        """Return the data of the matching loans, sorted."""
+        index = current_loans_memory_index()
+        filters = [f for f in self._filters if not f[0] and f[2] is not None]
+        indexed = [f for f in filters if f[1] in LoansMemoryIndex.INDEXED_FIELDS]
+        if indexed:
+            ids = None
+            for _, field, terms, _ in indexed:
+                matching = index.ids(field, terms)
+                ids = matching if ids is None else ids & matching
+                if not ids:
+                    break
+        else:
+            ids = index.ids()
+
+        loans = []
+        for id_ in ids:
+            data = index.get(id_)
+            if data is None:
+                continue
+            if all(
+                predicate(data) != negate for negate, _, _, predicate in self._filters
+            ):
+                loans.append((id_, data))
+
+        loans.sort(key=lambda loan: loan[0])
+        for field, desc in reversed(self._sort):
+            present = [loan for loan in loans if _value(loan[1], field) is not None]
+            missing = [loan for loan in loans if _value(loan[1], field) is None]
+            present.sort(key=lambda loan: _value(loan[1], field), reverse=desc)
+            loans = present + missing
+        if self._search_after is not None:
+            loans = [loan for loan in loans if self._is_after(loan[1])]
+        return loans
+
+    def _hit(self, id_, data):
+        """Return a hit of the given loan data."""
+        source = data
+        if self._source is not None:
+            source = {k: v for k, v in data.items() if k in self._source}
+        document = dict(_id=id_, _index="loans", _source=deepcopy(source))
+        if self._sort:
+            document["sort"] = self._sort_values(data)
+        return dsl.response.Hit(document)
+
+    def count(self):
+        """Return the number of matching loans."""
+        count_query("search")
+        return len(self._matches())
+
+    def execute(self):
+        """Return the response of the search."""
+        count_query("search")
+        loans = self._matches()
+        total = None
+        track = self._track_total_hits
+        if track is True:
+            total = dsl.AttrDict(dict(value=len(loans), relation="eq"))
+        elif track is not False:
+            value = min(len(loans), track)
+            relation = "gte" if value == track else "eq"
+            total = dsl.AttrDict(dict(value=value, relation=relation))
+        limit = 10 if self._limit is None else self._limit
+        page = loans[self._offset : self._offset + limit]
+        return LoansSQLResponse([self._hit(*loan) for loan in page], total=total)
+
+    def scan(self):
+        """Iterate over all the matching loans."""
+        count_query("search")
+        for loan in self._matches():
+            yield self._hit(*loan)
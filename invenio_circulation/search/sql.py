@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation loans search on the records table."""
+
+from copy import copy
+
+import sqlalchemy as sa
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_records.models import RecordMetadata
+from invenio_search.engine import dsl
+from sqlalchemy.dialects import postgresql
+
+from ..pidstore.pids import CIRCULATION_LOAN_PID_TYPE
+from ..timing import count_query
+
+
+def loans_query(*columns):
+    """Return a query of the given columns of the registered loans."""
+    return (
+        db.session.query(*columns)
+        .join(
+            PersistentIdentifier,
+            PersistentIdentifier.object_uuid == RecordMetadata.id,
+        )
+        .filter(
+            PersistentIdentifier.pid_type == CIRCULATION_LOAN_PID_TYPE,
+            PersistentIdentifier.status == PIDStatus.REGISTERED,
+            RecordMetadata.json.isnot(None),
+        )
+    )
+
+
+def loan_field(name):
+    """Return the SQL expression of a loan field, e.g. `item_pid__value`."""
+    path = tuple(name.split("__"))
+    if db.engine.dialect.name == "postgresql":
+        json = sa.type_coerce(RecordMetadata.json, postgresql.JSONB)
+        return json[path].astext if len(path) > 1 else json[path[0]].astext
+    json = sa.type_coerce(RecordMetadata.json, sa.JSON)
+    return json[path].as_string()
+
+
+def _field_value(data, field):
+    """Return the value of a loan field, e.g. `item_pid__value`."""
+    for key in field.split("__"):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+class _Hits(list):
+    """List of hits with the total number of matching loans."""
+
+    total = None
+
+
+class LoansSQLResponse(object):
+    """Response of a loans search on the records table."""
+
+    def __init__(self, hits, total=None):
+        """Constructor."""
+        self.hits = _Hits(hits)
+        self.hits.total = total
+
+    def __iter__(self):
+        """Iterate over the hits."""
+        return iter(self.hits)
+
+    def __len__(self):
+        """Return the number of hits."""
+        return len(self.hits)
+
+
+class LoansSQLSearch(object):
+    """Loans search querying the loans JSON in the records table.
+
+    It supports the subset of the search DSL used by the circulation search
+    functions: ``term``, ``terms`` and ``range`` filters and excludes,
+    sorting, source filtering, pagination, ``search_after`` pagination on the
+    sort fields and ``scan()``. The searches see
+    the changes of the current database transaction, unlike the search
+    cluster which is refreshed asynchronously.
+
+    On PostgreSQL, the expression indexes created by the migrations make the
+    searches on the item, document, patron and state of the loans efficient.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._filters = []
+        self._sort = []
+        self._source = None
+        self._offset = 0
+        self._limit = None
+        self._track_total_hits = True
+        self._search_after = None
+
+    def _clone(self):
+        """Return a copy of the search."""
+        search = copy(self)
+        search._filters = list(self._filters)
+        search._sort = list(self._sort)
+        return search
+
+    def _condition(self, name, **kwargs):
+        """Return the SQL condition of a `term`, `terms` or `range` query."""
+        ((field, value),) = kwargs.items()
+        expression = loan_field(field)
+        if name == "term":
+            return expression == str(value)
+        if name == "terms":
+            return expression.in_([str(v) for v in value])
+        if name == "range":
+            operators = dict(gt="__gt__", gte="__ge__", lt="__lt__", lte="__le__")
+            return sa.and_(
+                *[
+                    getattr(expression, operators[op])(str(bound))
+                    for op, bound in value.items()
+                ]
+            )
+        raise ValueError("Unsupported query '{}'".format(name))
+
+    def filter(self, name, **kwargs):
+        """Return a search matching the given query."""
+        search = self._clone()
+        search._filters.append(self._condition(name, **kwargs))
+        return search
+
+    def exclude(self, name, **kwargs):
+        """Return a search not matching the given query."""
+        search = self._clone()
+        condition = self._condition(name, **kwargs)
+        ((field, _),) = kwargs.items()
+        search._filters.append(sa.or_(sa.not_(condition), loan_field(field).is_(None)))
+        return search
+
+    def sort(self, *keys):
+        """Return a search sorted by the given fields."""
+        search = self._clone()
+        for key in keys:
+            if isinstance(key, dict):
+                ((field, options),) = key.items()
+                order = options.get("order", "asc")
+            else:
+                field, order = key.lstrip("-"), "desc" if key[0] == "-" else "asc"
+            search._sort.append((field.replace(".", "__"), order == "desc"))
+        return search
+
+    def source(self, includes=None, **kwargs):
+        """Return a search returning only the given fields of the loans."""
+        search = self._clone()
+        search._source = includes
+        return search
+
+    def extra(
+        self,
+        size=None,
+        track_total_hits=None,
+        search_after=None,
+        terminate_after=None,
+        **kwargs
+    ):
+        """Return a search with the given size, total and pagination options.
+
+        `terminate_after` is accepted and ignored, it does not change the
+        results. Any other option raises a ValueError.
+        """
+        if kwargs:
+            raise ValueError(
+                "Unsupported search options '{}'".format(", ".join(sorted(kwargs)))
+            )
+        search = self._clone()
+        if size is not None:
+            search._limit = size
+        if track_total_hits is not None:
+            search._track_total_hits = track_total_hits
+        if search_after is not None:
+            search._search_after = list(search_after)
+        return search
+
+    def __getitem__(self, key):
+        """Return a search paginated with the given slice."""
+        search = self._clone()
+        search._offset = key.start or 0
+        if key.stop is not None:
+            search._limit = key.stop - search._offset
+        return search
+
+    def _query(self, search_after=True):
+        """Return the SQL query of the matching loans.
+
+        :param search_after: False to include the loans before `search_after`,
+            like the search cluster does when counting the total.
+        """
+        query = loans_query(RecordMetadata.json).filter(*self._filters)
+        if search_after and self._search_after is not None:
+            query = query.filter(self._after_condition())
+        return query
+
+    def _after_condition(self):
+        """Return the SQL condition of the loans sorted after `search_after`."""
+        if len(self._search_after) != len(self._sort):
+            raise ValueError("search_after requires one value per sort field.")
+        conditions = []
+        equal = []
+        for (field, desc), value in zip(self._sort, self._search_after):
+            expression = loan_field(field)
+            value = str(value)
+            after = expression < value if desc else expression > value
+            conditions.append(sa.and_(*equal, after))
+            equal.append(expression == value)
+        return sa.or_(*conditions)
+
+    def _order_by(self):
+        """Return the SQL order by clauses of the sort fields."""
+        return [
+            loan_field(field).desc() if desc else loan_field(field)
+            for field, desc in self._sort
+        ]
+
+    def _hit(self, data):
+        """Return a hit of the given loan data, with its sort values."""
+        document = dict(_index="loans")
+        if self._sort:
+            document["sort"] = [_field_value(data, field) for field, _ in self._sort]
+        if self._source is not None:
+            data = {k: v for k, v in data.items() if k in self._source}
+        document["_source"] = data
+        return dsl.response.Hit(document)
+
+    def count(self):
+        """Return the number of matching loans."""
+        count_query("search")
+        return self._query(False).count()
+
+    def execute(self):
+        """Return the response of the search."""
+        count_query("search")
+        query = self._query().order_by(*self._order_by())
+        total = None
+        track = self._track_total_hits
+        if track is True:
+            total = dsl.AttrDict(dict(value=self._query(False).count(), relation="eq"))
+        elif track is not False:
+            # count at most `track` loans, like the search cluster does
+            value = self._query(False).limit(track).count()
+            relation = "gte" if value == track else "eq"
+            total = dsl.AttrDict(dict(value=value, relation=relation))
+        hits = []
+        if self._limit != 0:
+            query = query.offset(self._offset)
+            limit = 10 if self._limit is None else self._limit
+            hits = [self._hit(row.json) for row in query.limit(limit)]
+        return LoansSQLResponse(hits, total=total)
+
+    def scan(self):
+        """Iterate over all the matching loans."""
+        count_query("search")
+        query = self._query().order_by(*self._order_by())
+        for row in query.yield_per(1000):
+            yield self._hit(row.json)
@@ -16,7 +16,8 @@ loan_state_changed = _signals.signal("loan-state-changed")
 """Loan state changed signal.
 
 Broadcasted when a loan action is triggered, sending the old and the updated
-loan object.
+loan object, and the names of the loan fields changed by the transition as
+``changed_fields``.
 """
 
 loan_replace_item = _signals.signal("loan-replace-item")
@@ -25,3 +26,20 @@ loan_replace_item = _signals.signal("loan-replace-item")
 Broadcasted when the item in a Loan is replaced, sending the old and the new
 item_pid.
 """
+
+loans_overdue = _signals.signal("loans-overdue")
+"""Overdue loans signal.
+
+Broadcasted by `detect_overdue_loans` for each batch of loans that became
+overdue since the previous run, sending the list of ``LoanHit`` as ``loans``.
+"""
+
+transition_timed = _signals.signal("transition-timed")
+"""Transition timed signal.
+
+Broadcasted after each successful transition when
+``CIRCULATION_TRANSITION_TIMING`` is enabled, sending the ``transition``, the
+``loan``, its total ``duration`` in seconds and the ``phases`` of the
+execution: a dict of phase names to a dict with the ``duration`` of the
+phase and the number of ``sql`` and ``search`` queries made during it.
+"""
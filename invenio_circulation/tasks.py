@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation background tasks."""
+
+from itertools import islice
+
+import arrow
+from celery import shared_task
+from flask import current_app
+
+from .api import Loan
+from .proxies import current_circulation
+from .search.api import search_after_scan, search_expired_loans
+from .transitions.transitions import _update_document_pending_request_for_item
+from .uow import savepoint, unit_of_work
+
+
+def _get_expired_loan_pids(until, page_size):
+    """Yield the pids of the expirable loans with an expired request."""
+    for state in current_app.config["CIRCULATION_STATES_LOAN_EXPIRABLE"]:
+        search = search_expired_loans(state, until).source(includes=["pid"])
+        for hit in search_after_scan(search, page_size=page_size):
+            yield hit["pid"]
+
+
+def _cancel_kwargs(loan, transaction_user_pid, transaction_location_pid):
+    """Return the parameters of the `cancel` action of an expired loan."""
+    kwargs = dict(
+        trigger="cancel",
+        transaction_user_pid=transaction_user_pid,
+        transaction_location_pid=(
+            transaction_location_pid or loan.get("transaction_location_pid")
+        ),
+        patron_pid=loan["patron_pid"],
+        document_pid=loan["document_pid"],
+        cancel_reason="EXPIRED",
+    )
+    if loan.get("item_pid"):
+        kwargs["item_pid"] = loan["item_pid"]
+    return kwargs
+
+
+def _reassign_item(item_pid):
+    """Assign the item freed by expired loans to the pending requests."""
+    try:
+        with savepoint():
+            _update_document_pending_request_for_item(item_pid)
+    except Exception:
+        current_app.logger.exception(
+            "Failed to assign the item {} to the pending requests.".format(item_pid)
+        )
+
+
+def expire_loan_requests(
+    transaction_user_pid, transaction_location_pid=None, until=None, chunk_size=None
+):
+    """Cancel the loans with a request expire date in the past.
+
+    The loans of ``CIRCULATION_STATES_LOAN_EXPIRABLE`` are found with one range
+    search per state and cancelled by chunks, each chunk being committed and
+    indexed at once. The items of the cancelled loans that were at desk are
+    then assigned to the pending requests of their document, once per item.
+
+    :param transaction_user_pid: the user pid of the cancel transactions.
+    :param transaction_location_pid: the location pid of the cancel
+        transactions, the transaction location of each loan if not set.
+    :param until: the date when the requests are expired, today (UTC) if not
+        set.
+    :param chunk_size: the number of loans cancelled at once, defaults to
+        ``CIRCULATION_EXPIRE_LOAN_REQUESTS_CHUNK_SIZE``.
+    :return: a tuple with the number of cancelled loans and of failures.
+    """
+    until = (until or arrow.utcnow().date()).isoformat()
+    chunk_size = (
+        chunk_size or current_app.config["CIRCULATION_EXPIRE_LOAN_REQUESTS_CHUNK_SIZE"]
+    )
+    active_states = current_app.config["CIRCULATION_STATES_LOAN_ACTIVE"]
+    expirable_states = current_app.config["CIRCULATION_STATES_LOAN_EXPIRABLE"]
+    pids = _get_expired_loan_pids(until, chunk_size)
+
+    cancelled = failed = 0
+    while True:
+        chunk = list(islice(pids, chunk_size))
+        if not chunk:
+            return cancelled, failed
+
+        # skip the loans changed since they were indexed
+        loans = [
+            loan
+            for loan in Loan.get_records_by_pids(chunk)
+            if loan["state"] in expirable_states
+            and loan.get("request_expire_date", until) < until
+        ]
+        if not loans:
+            continue
+        requests = [
+            (loan, _cancel_kwargs(loan, transaction_user_pid, transaction_location_pid))
+            for loan in loans
+        ]
+        # the item of a loan at desk is freed by the cancellation
+        items = [
+            loan.get("item_pid") if loan["state"] in active_states else None
+            for loan in loans
+        ]
+        with unit_of_work():
+            results = current_circulation.circulation.trigger_many(requests)
+            freed_items = {}
+            for (loan, error), item_pid in zip(results, items):
+                if error:
+                    failed += 1
+                    current_app.logger.warning(
+                        "Failed to expire the loan {}: {}".format(loan["pid"], error)
+                    )
+                    continue
+                cancelled += 1
+                if item_pid:
+                    freed_items[(item_pid["type"], item_pid["value"])] = item_pid
+            for item_pid in freed_items.values():
+                _reassign_item(item_pid)
+
+
+@shared_task(ignore_result=True)
+def expire_loan_requests_task(transaction_user_pid, transaction_location_pid=None):
+    """Cancel the loans with a request expire date in the past."""
+    cancelled, failed = expire_loan_requests(
+        transaction_user_pid, transaction_location_pid=transaction_location_pid
+    )
+    current_app.logger.info(
+        "Expired {} loan requests, {} failures.".format(cancelled, failed)
+    )
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation transitions timing."""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from invenio_db import db
+from sqlalchemy import event
+
+from .signals import transition_timed
+
+QUERY_KINDS = ("sql", "search")
+
+
+class TransitionTimer(object):
+    """Durations and query counts of the phases of a transition execution.
+
+    Each call to :meth:`lap` ends the current phase, started by the previous
+    lap or when the timer was created.
+    """
+
+    def __init__(self, transition):
+        """Constructor."""
+        self.transition = transition
+        self.phases = {}
+        self._queries = dict.fromkeys(QUERY_KINDS, 0)
+        self._start = self._last = time.perf_counter()
+
+    def count_query(self, kind):
+        """Count a query made during the current phase."""
+        self._queries[kind] += 1
+
+    def lap(self, phase):
+        """End the given phase."""
+        now = time.perf_counter()
+        timing = self.phases.setdefault(
+            phase, dict(dict.fromkeys(QUERY_KINDS, 0), duration=0.0)
+        )
+        timing["duration"] += now - self._last
+        for kind in QUERY_KINDS:
+            timing[kind] += self._queries[kind]
+        self._queries = dict.fromkeys(QUERY_KINDS, 0)
+        self._last = now
+
+    @property
+    def duration(self):
+        """Return the duration since the timer was created."""
+        return self._last - self._start
+
+
+def _timers():
+    """Return the stack of the running timers, innermost last."""
+    if not has_app_context():
+        return ()
+    return g.get("circulation_transition_timers", ())
+
+
+def lap(phase):
+    """End the given phase of the running transition timer, if any."""
+    timers = _timers()
+    if timers:
+        timers[-1].lap(phase)
+
+
+def count_query(kind):
+    """Count a query of the given kind in the running transition timers."""
+    for timer in _timers():
+        timer.count_query(kind)
+
+
+def _count_sql_query(*args, **kwargs):
+    """Count an SQL query executed by the database engine."""
+    count_query("sql")
+
+
+def timed_transition(f):
+    """Decorator to time the phases of a transition execution.
+
+    When ``CIRCULATION_TRANSITION_TIMING`` is enabled, a timer is started
+    before the checks of the transition and ``transition_timed`` is sent
+    when the transition succeeds. The phases of a transition triggered by
+    another one are included in the phase of the outer transition.
+    """
+
+    @wraps(f)
+    def inner(self, loan, **kwargs):
+        if not current_app.config["CIRCULATION_TRANSITION_TIMING"]:
+            return f(self, loan, **kwargs)
+
+        engine = db.engine
+        if not event.contains(engine, "before_cursor_execute", _count_sql_query):
+            event.listen(engine, "before_cursor_execute", _count_sql_query)
+
+        timer = TransitionTimer(self)
+        timers = g.setdefault("circulation_transition_timers", [])
+        timers.append(timer)
+        try:
+            result = f(self, loan, **kwargs)
+        finally:
+            timers.pop()
+        transition_timed.send(
+            current_app._get_current_object(),
+            transition=self,
+            loan=loan,
+            phases=timer.phases,
+            duration=timer.duration,
+        )
+        return result
+
+    return inner
+
+
+def log_transition_timing(sender, transition=None, loan=None, phases=None, **kwargs):
+    """Log the timing of a transition as a JSON line."""
+    if not sender.config["CIRCULATION_TRANSITION_TIMING_LOG"]:
+        return
+    data = dict(
+        transition=type(transition).__name__,
+        src=transition.src,
+        dest=transition.dest,
+        trigger=transition.trigger,
+        loan_pid=loan.get("pid"),
+        duration=kwargs.get("duration"),
+        phases=phases,
+    )
+    sender.logger.info("circulation.transition %s", json.dumps(data, sort_keys=True))
+
+
+def record_transition_timing(sender, transition=None, phases=None, **kwargs):
+    """Record the timing of a transition in the histograms of the app."""
+    timings = sender.extensions["invenio-circulation"].transition_timings
+    timings.observe(type(transition).__name__, phases)
+
+
+class TransitionTimings(object):
+    """Histograms of the phase durations of the transitions, per class.
+
+    The query counts are kept as totals. The histograms are kept in the
+    memory of the process, since it started.
+    """
+
+    def __init__(self, buckets):
+        """Constructor.
+
+        :param buckets: the upper bounds of the histogram buckets, in seconds.
+        """
+        self.buckets = sorted(buckets)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, transition, phases):
+        """Record the phases of a transition execution."""
+        with self._lock:
+            for phase, timing in phases.items():
+                histogram = self._histograms.get((transition, phase))
+                if histogram is None:
+                    histogram = self._histograms[(transition, phase)] = dict(
+                        dict.fromkeys(QUERY_KINDS, 0),
+                        buckets=[0] * (len(self.buckets) + 1),
+                        count=0,
+                        sum=0.0,
+                    )
+                histogram["buckets"][bisect_left(self.buckets, timing["duration"])] += 1
+                histogram["count"] += 1
+                histogram["sum"] += timing["duration"]
+                for kind in QUERY_KINDS:
+                    histogram[kind] += timing[kind]
+
+    def reset(self):
+        """Remove all the recorded timings."""
+        with self._lock:
+            self._histograms = {}
+
+    def to_dict(self):
+        """Return the histograms, per transition class and phase."""
+        with self._lock:
+            histograms = {
+                key: dict(h, buckets=list(h["buckets"]))
+                for key, h in self._histograms.items()
+            }
+        result = {}
+        for (transition, phase), histogram in sorted(histograms.items()):
+            bounds = self.buckets + ["+Inf"]
+            histogram["buckets"] = dict(zip(map(str, bounds), histogram["buckets"]))
+            result.setdefault(transition, {})[phase] = histogram
+        return result
+
+    def to_prometheus(self):
+        """Return the histograms in the Prometheus text format."""
+        name = "invenio_circulation_transition_phase_seconds"
+        queries = "invenio_circulation_transition_phase_queries_total"
+        lines = [
+            "# HELP {} Duration of the phases of the transitions.".format(name),
+            "# TYPE {} histogram".format(name),
+        ]
+        query_lines = [
+            "# HELP {} Queries made in the phases of the transitions.".format(queries),
+            "# TYPE {} counter".format(queries),
+        ]
+        for transition, phases in self.to_dict().items():
+            for phase, histogram in phases.items():
+                labels = 'transition="{}",phase="{}"'.format(transition, phase)
+                cumulative = 0
+                for bound, count in histogram["buckets"].items():
+                    cumulative += count
+                    lines.append(
+                        '{}_bucket{{{},le="{}"}} {}'.format(
+                            name, labels, bound, cumulative
+                        )
+                    )
+                lines.append("{}_sum{{{}}} {}".format(name, labels, histogram["sum"]))
+                lines.append(
+                    "{}_count{{{}}} {}".format(name, labels, histogram["count"])
+                )
+                for kind in QUERY_KINDS:
+                    query_lines.append(
+                        '{}{{{},kind="{}"}} {}'.format(
+                            queries, labels, kind, histogram[kind]
+                        )
+                    )
+        return "\n".join(lines + query_lines) + "\n"
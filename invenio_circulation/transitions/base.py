@@ -8,12 +8,10 @@
 
 """Invenio Circulation base transitions."""
 
-import copy
 from datetime import datetime
 
 import arrow
 from flask import current_app, has_request_context
-from invenio_db import db
 
 from ..api import Loan, is_item_available_for_checkout
 from ..errors import (
@@ -26,8 +24,9 @@ from ..errors import (
     TransitionConditionsFailedError,
     TransitionConstraintsViolationError,
 )
-from ..proxies import current_circulation
 from ..signals import loan_state_changed
+from ..timing import lap, timed_transition
+from ..uow import commit_loan
 from ..utils import str2datetime
 
 
@@ -180,6 +179,7 @@ class Transition(object):
         loan.update(kwargs)
         loan.setdefault("transaction_date", arrow.utcnow())
 
+    @timed_transition
     @check_trigger
     @has_permission
     @ensure_required_params
@@ -187,14 +187,17 @@ class Transition(object):
     @ensure_same_patron
     def execute(self, loan, transition_kwargs=None, **kwargs):
         """Execute before actions, transition and after actions."""
+        lap("checks")
         self._date_fields2datetime(kwargs)
         loan.date_fields2datetime()
 
-        initial_loan = copy.deepcopy(loan)
+        initial_loan = loan.snapshot()
 
         self.before(loan, initial_loan, transition_kwargs=transition_kwargs, **kwargs)
         loan["state"] = self.dest
+        lap("before")
         self.after(loan, initial_loan, transition_kwargs=transition_kwargs, **kwargs)
+        lap("after")
 
     def after(self, loan, initial_loan, transition_kwargs=None, **kwargs):
         """Commit record and index."""
@@ -203,10 +206,7 @@ class Transition(object):
         initial_loan.date_fields2str()
         loan.date_fields2str()
 
-        loan.commit()
-        db.session.commit()
-
-        current_circulation.loan_indexer().index(loan)
+        commit_loan(loan)
 
         loan_state_changed.send(
             current_app._get_current_object(),
@@ -214,5 +214,7 @@ class Transition(object):
             initial_loan=initial_loan,
             loan=loan,
             trigger=self.trigger,
+            changed_fields=loan.changed_fields(initial_loan),
             **transition_kwargs,
         )
+        lap("signal")
@@ -8,10 +8,8 @@
 
 """Invenio Circulation custom transitions."""
 
+import arrow
 from flask import current_app
-from invenio_db import db
-
-from invenio_circulation.proxies import current_circulation
 
 from ..api import (
     can_be_requested,
@@ -19,6 +17,7 @@ from ..api import (
     get_document_pid_by_item_pid,
     get_pending_loans_by_doc_pid,
     is_item_at_desk_available_for_checkout,
+    iter_hold_queue,
 )
 from ..errors import (
     ItemDoNotMatchError,
@@ -29,6 +28,7 @@ from ..errors import (
     TransitionConstraintsViolationError,
 )
 from ..transitions.base import Transition
+from ..uow import commit_loan
 
 
 def _ensure_valid_loan_duration(loan, initial_loan):
@@ -91,17 +91,44 @@ def ensure_same_item(f):
 
 
 def _update_document_pending_request_for_item(item_pid, **kwargs):
-    """Update pending loans on a Document with no Item attached yet.
+    """Assign the item to the first pending request of its Document.
+
+    The pending requests are ordered with ``CIRCULATION_HOLD_QUEUE_SORT_KEY``,
+    then by record id, like the hold queue of the document. The first one
+    without an item attached yet, or already attached to this item, gets the
+    item. The other requests are left untouched.
+
+    With ``CIRCULATION_HOLD_QUEUE_TABLE`` enabled, the requests are read in
+    order from the table, until the first one that can get the item.
 
     :param item_pid: a dict containing `value` and `type` fields to
         uniquely identify the item.
     """
     document_pid = get_document_pid_by_item_pid(item_pid)
-    for pending_loan in get_pending_loans_by_doc_pid(document_pid):
-        pending_loan["item_pid"] = item_pid
-        pending_loan.commit()
-        db.session.commit()
-        current_circulation.loan_indexer().index(pending_loan)
+    if current_app.config["CIRCULATION_HOLD_QUEUE_TABLE"]:
+        pending_loans = iter_hold_queue(document_pid)
+    else:
+        sort_key = current_app.config["CIRCULATION_HOLD_QUEUE_SORT_KEY"]
+        # same order as `get_hold_queue`, ties broken by the record id
+        pending_loans = sorted(
+            get_pending_loans_by_doc_pid(document_pid),
+            key=lambda loan: (sort_key(loan), str(loan.id)),
+        )
+
+    request_states = current_app.config["CIRCULATION_STATES_LOAN_REQUEST"]
+    today = arrow.utcnow().date().isoformat()
+    for pending_loan in pending_loans:
+        if pending_loan["state"] not in request_states:
+            # stale search result, e.g. cancelled in the same transaction
+            continue
+        if pending_loan.get("request_start_date", today) > today:
+            continue
+        if pending_loan.get("item_pid") not in (None, item_pid):
+            continue
+        if pending_loan.get("item_pid") != item_pid:
+            pending_loan["item_pid"] = item_pid
+            commit_loan(pending_loan)
+        return
 
 
 def _is_same_location(item_pid, location_pid):
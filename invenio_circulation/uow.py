@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Circulation unit of work."""
+
+from contextlib import contextmanager
+
+from flask import current_app, g
+from invenio_db import db
+
+from .indexer import flush_index_buffer, index_loan, index_loans
+from .timing import lap
+
+
+class LoanUnitOfWork(object):
+    """Loans persisted by transitions, committed and indexed at once."""
+
+    def __init__(self):
+        """Constructor."""
+        self._loans = {}
+
+    def register(self, loan):
+        """Register a loan to be indexed when the unit of work is committed."""
+        self._loans[loan.id] = loan
+
+    @contextmanager
+    def savepoint(self):
+        """Execute the block in a database savepoint.
+
+        If the block fails, the savepoint is rolled back and the loans it
+        registered are forgotten, as their changes were not persisted. A loan
+        that was already registered before the block is reloaded from the
+        database instead.
+        """
+        registered, self._loans = self._loans, {}
+        try:
+            with db.session.begin_nested():
+                yield self
+        except Exception:
+            for loan_id, loan in self._loans.items():
+                if loan_id in registered:
+                    registered[loan_id] = loan.get_record(loan_id)
+            raise
+        else:
+            registered.update(self._loans)
+        finally:
+            self._loans = registered
+
+    def commit(self):
+        """Commit the database transaction and bulk index the loans."""
+        db.session.commit()
+        loans, self._loans = list(self._loans.values()), {}
+        index_loans(loans)
+
+    def rollback(self):
+        """Rollback the database transaction and forget the loans."""
+        db.session.rollback()
+        self._loans = {}
+
+
+def get_unit_of_work():
+    """Return the active unit of work, if any."""
+    return g.get("circulation_uow")
+
+
+@contextmanager
+def unit_of_work():
+    """Defer the commit and the indexing of the loans to the end of the block.
+
+    Transitions executed in the block only flush their changes to the
+    database. When the block exits, the changes are committed in a single
+    transaction and the modified loans are indexed with a bulk request. If an
+    exception is raised, the transaction is rolled back. A nested block joins
+    the unit of work that is already active.
+    """
+    uow = get_unit_of_work()
+    if uow:
+        yield uow
+        return
+
+    uow = g.circulation_uow = LoanUnitOfWork()
+    try:
+        yield uow
+    except Exception:
+        uow.rollback()
+        raise
+    else:
+        uow.commit()
+    finally:
+        g.pop("circulation_uow", None)
+
+
+@contextmanager
+def savepoint():
+    """Execute the block in a savepoint of the active unit of work, if any."""
+    uow = get_unit_of_work()
+    if uow:
+        with uow.savepoint():
+            yield
+    else:
+        with db.session.begin_nested():
+            yield
+
+
+@contextmanager
+def action_unit_of_work():
+    """Execute a loan action in a unit of work, if enabled in the config.
+
+    When ``CIRCULATION_UNIT_OF_WORK`` is disabled, the transitions commit the
+    loans they modify and the session is committed again when the block exits.
+    The loans buffered by ``CIRCULATION_LOAN_INDEX_BUFFER`` are indexed when
+    the block exits, before the response is sent.
+    """
+    if current_app.config["CIRCULATION_UNIT_OF_WORK"]:
+        with unit_of_work() as uow:
+            yield uow
+    else:
+        yield None
+        db.session.commit()
+    flush_index_buffer()
+
+
+def commit_loan(loan):
+    """Persist the loan and index it, or defer it to the active unit of work."""
+    loan.commit()
+    lap("loan_commit")
+    uow = get_unit_of_work()
+    if uow:
+        uow.register(loan)
+    else:
+        db.session.commit()
+        lap("db_commit")
+        index_loan(loan)
+        lap("index")
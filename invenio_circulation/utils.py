@@ -8,6 +8,10 @@
 
 """Circulation API."""
 
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+
 import arrow
 from flask import current_app
 
@@ -146,11 +150,61 @@ def transaction_user_validator(transaction_user_pid):
     )
 
 
+ISO8601_UTC_REGEX = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})"
+    r"(?:T(\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?(?:Z|\+00:00)?)?$"
+)
+"""Dates and UTC datetimes, the formats of the loan date fields."""
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso8601_utc(str_date):
+    """Parse a date or UTC datetime string, None if not in these formats."""
+    match = ISO8601_UTC_REGEX.match(str_date)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    try:
+        value = datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+            int((fraction or "0").ljust(6, "0")),
+            tzinfo=timezone.utc,
+        )
+    except ValueError:
+        return None
+    return arrow.Arrow.fromdatetime(value)
+
+
 def str2datetime(str_date):
-    """Parse string date with timezone and return a datetime object."""
+    """Parse string date with timezone and return a datetime object.
+
+    Dates and UTC datetimes, as stored in the loans, are parsed directly and
+    the results of the most recent values are cached. Any other input is
+    parsed by arrow.
+    """
+    if isinstance(str_date, str):
+        value = _parse_iso8601_utc(str_date)
+        if value is not None:
+            return value
     return arrow.get(str_date).to("utc")
 
 
+def hold_queue_sort_key(loan):
+    """Return the sort key of a pending loan in the requests queue.
+
+    The requests are served in the order they were made: by request start
+    date, then by transaction date.
+    """
+    transaction_date = loan.get("transaction_date") or ""
+    request_start_date = loan.get("request_start_date") or transaction_date[:10]
+    return "{} {}".format(request_start_date, transaction_date)
+
+
 def validate_item_pickup_transaction_locations(loan, destination, **kwargs):
     """Validate the loan item, pickup and transaction locations.
 
@@ -10,14 +10,25 @@
 
 from copy import deepcopy
 
-from flask import Blueprint, current_app, request, url_for
-from invenio_db import db
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+    url_for,
+)
+from flask.views import MethodView
 from invenio_records_rest.utils import obj_or_import_string
 from invenio_records_rest.views import pass_record
 from invenio_rest import ContentNegotiatedMethodView
 
+from .api import Loan, get_hold_queue, get_hold_queue_position
+from .callbacks import CallbacksProfile
 from .errors import (
     InvalidLoanStateError,
+    InvalidParameterError,
     ItemNotAvailableError,
     MissingRequiredParameterError,
 )
@@ -25,7 +36,10 @@ from .permissions import need_permissions
 from .pidstore.pids import _LOANID_CONVERTER, CIRCULATION_LOAN_PID_TYPE
 from .proxies import current_circulation
 from .records.loaders import loan_loader, loan_replace_item_loader
+from .search.api import search_after_scan, search_loans_for_export
 from .signals import loan_replace_item
+from .uow import action_unit_of_work, commit_loan
+from .utils import str2datetime
 
 
 def extract_transitions_from_app(app):
@@ -102,10 +116,10 @@ class LoanActionResource(ContentNegotiatedMethodView):
     def post(self, pid, record, action, **kwargs):
         """Handle loan action."""
         data = self.loader()
-        record = current_circulation.circulation.trigger(
-            record, **dict(data, trigger=action)
-        )
-        db.session.commit()
+        with action_unit_of_work():
+            record = current_circulation.circulation.trigger(
+                record, **dict(data, trigger=action)
+            )
         return self.make_response(
             pid,
             record,
@@ -178,11 +192,9 @@ class LoanReplaceItemResource(ContentNegotiatedMethodView):
         new_item_pid = data.get("item_pid")
 
         validate_replace_item(record, new_item_pid)
-        record.update_item_ref(new_item_pid)
-
-        record.commit()
-        db.session.commit()
-        current_circulation.loan_indexer().index(record)
+        with action_unit_of_work():
+            record.update_item_ref(new_item_pid)
+            commit_loan(record)
 
         if old_item_pid:
             loan_replace_item.send(
@@ -195,3 +207,216 @@ class LoanReplaceItemResource(ContentNegotiatedMethodView):
             202,
             links_factory=current_app.config.get("CIRCULATION_LOAN_LINKS_FACTORY"),
         )
+
+
+def create_loan_export_blueprint(app):
+    """Create a blueprint for exporting Loans."""
+    blueprint = Blueprint("invenio_circulation_loan_export", __name__, url_prefix="")
+    blueprint.add_url_rule(
+        "/circulation/export/loans",
+        view_func=LoanExportResource.as_view(LoanExportResource.view_name),
+        methods=["GET"],
+    )
+    return blueprint
+
+
+def _get_export_search_args(args):
+    """Return the loans export search arguments from the query string."""
+    search_args = dict(
+        state=args.getlist("state"),
+        patron_pid=args.get("patron_pid"),
+        document_pid=args.get("document_pid"),
+        date_ranges={},
+    )
+
+    item_pid_type = args.get("item_pid_type")
+    item_pid_value = args.get("item_pid_value")
+    if item_pid_type or item_pid_value:
+        if not (item_pid_type and item_pid_value):
+            raise MissingRequiredParameterError(
+                description=(
+                    "Parameters 'item_pid_type' and 'item_pid_value' "
+                    "are required to filter by item."
+                )
+            )
+        search_args["item_pid"] = dict(type=item_pid_type, value=item_pid_value)
+
+    for field in Loan.DATE_FIELDS + Loan.DATETIME_FIELDS:
+        for suffix, operator in (("from", "gte"), ("to", "lte")):
+            value = args.get("{}_{}".format(field, suffix))
+            if not value:
+                continue
+            try:
+                str2datetime(value)
+            except ValueError:
+                raise InvalidParameterError(
+                    description="Invalid date '{}' for parameter '{}_{}'.".format(
+                        value, field, suffix
+                    )
+                )
+            search_args["date_ranges"].setdefault(field, {})[operator] = value
+    return search_args
+
+
+class LoanExportResource(MethodView):
+    """Loans export resource, streaming all the matching loans."""
+
+    view_name = "loan_export_resource"
+
+    @need_permissions("loan-export")
+    def get(self):
+        """Handle GET request to export the loans matching the filters.
+
+        The loans are filtered by `state` (repeatable), `patron_pid`,
+        `document_pid`, `item_pid_type` and `item_pid_value` and by date
+        ranges with `<date field>_from` and `<date field>_to`, e.g.
+        `start_date_from`. The `format` argument selects one of the
+        ``CIRCULATION_LOAN_EXPORT_FORMATS``.
+        """
+        formats = current_app.config["CIRCULATION_LOAN_EXPORT_FORMATS"]
+        export_format = request.args.get("format", "ndjson")
+        if export_format not in formats:
+            raise InvalidParameterError(
+                description="Invalid export format '{}', expected one of {}.".format(
+                    export_format, ", ".join(sorted(formats))
+                )
+            )
+        options = formats[export_format]
+        serializer = obj_or_import_string(options["serializer"])
+
+        search = search_loans_for_export(**_get_export_search_args(request.args))
+        hits = search_after_scan(
+            search, page_size=current_app.config["CIRCULATION_LOAN_EXPORT_PAGE_SIZE"]
+        )
+        return Response(
+            stream_with_context(serializer(hits)),
+            mimetype=options["mimetype"],
+            headers={
+                "Content-Disposition": "attachment; filename=loans.{}".format(
+                    export_format
+                )
+            },
+        )
+
+
+def create_hold_queue_blueprint(app):
+    """Create a blueprint for the requests queues of the documents."""
+    blueprint = Blueprint("invenio_circulation_hold_queue", __name__, url_prefix="")
+    blueprint.add_url_rule(
+        "/circulation/documents/<document_pid>/hold-queue",
+        view_func=DocumentHoldQueueResource.as_view(
+            DocumentHoldQueueResource.view_name
+        ),
+        methods=["GET"],
+    )
+    blueprint.add_url_rule(
+        "/circulation/loans/<{0}:pid_value>/hold-queue-position".format(
+            _LOANID_CONVERTER
+        ),
+        view_func=LoanHoldQueuePositionResource.as_view(
+            LoanHoldQueuePositionResource.view_name
+        ),
+        methods=["GET"],
+    )
+    return blueprint
+
+
+class DocumentHoldQueueResource(MethodView):
+    """Requests queue of a document."""
+
+    view_name = "document_hold_queue_resource"
+
+    @need_permissions("loan-read-access")
+    def get(self, document_pid):
+        """Handle GET request to list the pending loans of the document."""
+        queue = get_hold_queue(document_pid)
+        return jsonify(
+            document_pid=document_pid,
+            total=len(queue),
+            queue=[
+                dict(pid=pid, position=position)
+                for position, pid in enumerate(queue, start=1)
+            ],
+        )
+
+
+class LoanHoldQueuePositionResource(MethodView):
+    """Position of a pending loan in the requests queue of its document."""
+
+    view_name = "loan_hold_queue_position_resource"
+
+    @need_permissions("loan-read-access")
+    @pass_record
+    def get(self, pid, record, **kwargs):
+        """Handle GET request to get the position of the loan."""
+        position = get_hold_queue_position(record)
+        if position is None:
+            raise InvalidLoanStateError(
+                description="Loan '{}' is not a pending request.".format(pid.pid_value)
+            )
+        return jsonify(
+            pid=pid.pid_value, document_pid=record["document_pid"], position=position
+        )
+
+
+def create_metrics_blueprint(app):
+    """Create a blueprint for the circulation metrics."""
+    blueprint = Blueprint("invenio_circulation_metrics", __name__, url_prefix="")
+    blueprint.add_url_rule(
+        "/circulation/metrics/transitions",
+        view_func=TransitionTimingsResource.as_view(
+            TransitionTimingsResource.view_name
+        ),
+        methods=["GET"],
+    )
+    blueprint.add_url_rule(
+        "/circulation/metrics/callbacks",
+        view_func=CallbacksProfileResource.as_view(CallbacksProfileResource.view_name),
+        methods=["GET"],
+    )
+    return blueprint
+
+
+class TransitionTimingsResource(MethodView):
+    """Histograms of the transition timings of the process."""
+
+    view_name = "transition_timings_resource"
+
+    @need_permissions("circulation-metrics")
+    def get(self):
+        """Handle GET request to scrape the transition timings.
+
+        The histograms are returned in the Prometheus text format, or as
+        JSON with the `format=json` argument.
+        """
+        timings = current_circulation.transition_timings
+        if request.args.get("format") == "json":
+            return jsonify(timings.to_dict())
+        return Response(timings.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+class CallbacksProfileResource(MethodView):
+    """Profile of the configured callbacks of the process."""
+
+    view_name = "callbacks_profile_resource"
+
+    @need_permissions("circulation-metrics")
+    def get(self):
+        """Handle GET request to list the most expensive callbacks.
+
+        The `sort` argument selects the stats field to sort on, `total` by
+        default, and `size` the number of callbacks to return.
+        """
+        sort = request.args.get("sort", "total")
+        if sort not in CallbacksProfile.FIELDS:
+            raise InvalidParameterError(
+                description="Invalid sort '{}', expected one of {}.".format(
+                    sort, ", ".join(CallbacksProfile.FIELDS)
+                )
+            )
+        size = request.args.get("size", 20, type=int)
+        callbacks = current_circulation.callbacks_profile.top(limit=size, sort=sort)
+        return jsonify(
+            enabled=current_app.config["CIRCULATION_CALLBACKS_PROFILING"],
+            callbacks=callbacks,
+        )
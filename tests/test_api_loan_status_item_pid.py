@@ -8,14 +8,22 @@
 
 """Tests for loan states."""
 
+import mock
 import pytest
 from invenio_indexer.api import RecordIndexer
 from invenio_search import current_search
 
-from invenio_circulation.api import get_loan_for_item
-from invenio_circulation.errors import MultipleLoansOnItemError
+from invenio_circulation.api import (
+    get_available_item_by_doc_pid,
+    get_items_with_active_loan,
+    get_loan_for_item,
+    is_item_available_for_checkout,
+    sync_item_active_loans,
+)
+from invenio_circulation.errors import ItemNotAvailableError, MultipleLoansOnItemError
+from invenio_circulation.proxies import current_circulation
 
-from .helpers import create_loan
+from .helpers import SwappedConfig, create_loan
 
 
 def test_api_circulation_item_loan_pending(app, indexed_loans):
@@ -71,3 +79,106 @@ def test_multiple_active_loans(app, db, indexed_loans):
 
     with pytest.raises(MultipleLoansOnItemError):
         get_loan_for_item(multiple_loans_pid)
+
+    item_pids = [multiple_loans_pid, dict(type="itemid", value="item_on_loan_2")]
+    assert get_items_with_active_loan(item_pids) == {
+        ("itemid", "item_multiple_pending_on_loan_7"),
+        ("itemid", "item_on_loan_2"),
+    }
+
+
+def test_get_available_item_by_doc_pid(app, indexed_loans):
+    """Test that the first item without active loan is returned."""
+    item_pids = [
+        dict(type="itemid", value="item_on_loan_2"),
+        dict(type="itemid", value="item_at_desk_5"),
+        dict(type="itemid", value="item_returned_3"),
+        dict(type="itemid", value="item_pending_1"),
+    ]
+    assert get_items_with_active_loan(item_pids) == {
+        ("itemid", "item_on_loan_2"),
+        ("itemid", "item_at_desk_5"),
+    }
+    with SwappedConfig(
+        "CIRCULATION_ITEMS_RETRIEVER_FROM_DOCUMENT", lambda x: item_pids
+    ):
+        assert get_available_item_by_doc_pid("document_pid") == item_pids[2]
+    with SwappedConfig(
+        "CIRCULATION_ITEMS_RETRIEVER_FROM_DOCUMENT", lambda x: item_pids[:2]
+    ):
+        assert get_available_item_by_doc_pid("document_pid") is None
+
+
+def test_item_active_loan_table(app, db, params, loan_created):
+    """Test item availability based on the item active loan table."""
+    item_pid = params["item_pid"]
+    active_loan_data = {
+        "item_pid": item_pid,
+        "patron_pid": "2",
+        "state": "ITEM_ON_LOAN",
+        "transaction_date": "2018-06-26T09:00:00.442118+00:00",
+        "transaction_location_pid": "loc_pid",
+        "transaction_user_pid": "user_pid",
+        "start_date": "2018-07-24",
+        "end_date": "2018-08-23",
+    }
+
+    with SwappedConfig("CIRCULATION_ITEM_ACTIVE_LOAN_TABLE", True):
+        assert is_item_available_for_checkout(item_pid)
+        assert get_loan_for_item(item_pid) is None
+
+        loan = current_circulation.circulation.trigger(
+            loan_created, **dict(params, trigger="checkout")
+        )
+        assert not is_item_available_for_checkout(item_pid)
+        assert get_loan_for_item(item_pid).id == loan.id
+
+        with pytest.raises(ItemNotAvailableError):
+            create_loan(active_loan_data)
+
+        loan["state"] = "CANCELLED"
+        loan.commit()
+        assert is_item_available_for_checkout(item_pid)
+        assert get_loan_for_item(item_pid) is None
+
+
+def test_sync_item_active_loans(app, db, params):
+    """Test that the item active loan table is filled from the loans."""
+    active_loan_data = {
+        "item_pid": params["item_pid"],
+        "patron_pid": "2",
+        "state": "ITEM_ON_LOAN",
+        "transaction_date": "2018-06-26T09:00:00.442118+00:00",
+        "transaction_location_pid": "loc_pid",
+        "transaction_user_pid": "user_pid",
+        "start_date": "2018-07-24",
+        "end_date": "2018-08-23",
+    }
+    _, loan = create_loan(active_loan_data)
+    _, other_loan = create_loan(active_loan_data)
+    create_loan(dict(active_loan_data, state="ITEM_RETURNED"))
+    db.session.commit()
+
+    with SwappedConfig("CIRCULATION_ITEM_ACTIVE_LOAN_TABLE", True):
+        assert is_item_available_for_checkout(params["item_pid"])
+
+        assert sync_item_active_loans() == (1, [other_loan["pid"]])
+        assert not is_item_available_for_checkout(params["item_pid"])
+        assert get_loan_for_item(params["item_pid"]).id == loan.id
+
+
+def test_item_with_known_active_loan_is_not_checked(app):
+    """Test that the policy is not called for an item known to be on loan."""
+    item_pid = dict(type="itemid", value="item_pid")
+    policies = app.config["CIRCULATION_POLICIES"]
+    checkout = dict(
+        policies["checkout"], item_can_circulate=mock.Mock(return_value=True)
+    )
+    with SwappedConfig("CIRCULATION_POLICIES", dict(policies, checkout=checkout)):
+        assert not is_item_available_for_checkout(
+            item_pid, items_with_active_loan={("itemid", "item_pid")}
+        )
+        checkout["item_can_circulate"].assert_not_called()
+
+        assert is_item_available_for_checkout(item_pid, items_with_active_loan=set())
+        checkout["item_can_circulate"].assert_called_once_with(item_pid)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for circulation configured callbacks."""
+
+from invenio_circulation.callbacks import (
+    callbacks_cache,
+    memoize_callback,
+    profile_callbacks,
+    record_callbacks_request,
+)
+
+
+def test_memoized_callbacks_config(app):
+    """Test that the configured callbacks are memoized."""
+    for key in app.config["CIRCULATION_MEMOIZED_CALLBACKS"]:
+        assert app.config[key].memoized
+
+
+def test_memoize_callback(app):
+    """Test that callbacks are called once per PID in a cache block."""
+    calls = []
+
+    @memoize_callback
+    def item_exists(item_pid):
+        calls.append(item_pid)
+        return True
+
+    item_pid = dict(type="itemid", value="item_pid")
+    item_exists(item_pid)
+    item_exists(item_pid)
+    assert len(calls) == 2
+
+    with callbacks_cache():
+        assert item_exists(item_pid)
+        assert item_exists(dict(value="item_pid", type="itemid"))
+        with callbacks_cache():
+            assert item_exists(item_pid)
+        assert len(calls) == 3
+
+        item_exists(dict(type="itemid", value="other_item_pid"))
+        assert len(calls) == 4
+
+    item_exists(item_pid)
+    assert len(calls) == 5
+    assert memoize_callback(item_exists) is item_exists
+
+
+def test_profile_callbacks(app):
+    """Test that the calls of the profiled callbacks are recorded."""
+    profile = app.extensions["invenio-circulation"].callbacks_profile
+    profile.reset()
+    policies = dict(checkout=dict(item_can_circulate=lambda item_pid: True))
+    profiled = profile_callbacks("CIRCULATION_POLICIES", policies, profile)
+    item_can_circulate = profiled["checkout"]["item_can_circulate"]
+    assert item_can_circulate is not policies["checkout"]["item_can_circulate"]
+
+    with app.test_request_context():
+        assert item_can_circulate("item_pid")
+        assert item_can_circulate("item_pid")
+        record_callbacks_request()
+
+    (stats,) = profile.top()
+    assert stats["name"] == "CIRCULATION_POLICIES.checkout.item_can_circulate"
+    assert stats["calls"] == 2
+    assert stats["requests"] == 1
+    assert stats["max"] <= stats["max_per_request"] == stats["total"]
+
+    assert profile_callbacks("CIRCULATION_LOAN_RECORD_CLASS", dict, profile) is dict
+
+    profile.reset()
+    profile.record_request({stats["name"]: stats["total"]})
+    assert profile.top() == []
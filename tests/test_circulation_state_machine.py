@@ -8,13 +8,107 @@
 
 """Tests for circulation state machine logic."""
 
+import mock
 import pytest
 
-from invenio_circulation.errors import NoValidTransitionAvailableError
+from invenio_circulation.api import Loan
+from invenio_circulation.errors import (
+    MissingRequiredParameterError,
+    NoValidTransitionAvailableError,
+)
 from invenio_circulation.proxies import current_circulation
+from invenio_circulation.signals import loan_state_changed
+
+from .helpers import create_loan
 
 
 def test_invalid_transitions(loan_created, app, params):
     """Test that there are no conditional transitions at this state."""
     with pytest.raises(NoValidTransitionAvailableError):
         current_circulation.circulation.trigger(loan_created, **params)
+
+
+def test_transitions_indexed_by_state_and_trigger(app):
+    """Test that transitions are indexed by source state and trigger."""
+    circulation = current_circulation.circulation
+
+    transitions = circulation.get_transitions("ITEM_ON_LOAN", "extend")
+    assert [t.dest for t in transitions] == ["ITEM_ON_LOAN"]
+
+    transitions = circulation.get_transitions("ITEM_ON_LOAN")
+    assert [t.dest for t in transitions] == [
+        "ITEM_RETURNED",
+        "ITEM_IN_TRANSIT_TO_HOUSE",
+    ]
+
+    assert circulation.get_transitions("ITEM_RETURNED") == []
+    assert circulation.get_transitions("CREATED", "not_existing") == []
+
+
+def test_trigger_without_matching_transition(loan_created, app, params):
+    """Test that an unknown trigger fails without executing transitions."""
+    with pytest.raises(NoValidTransitionAvailableError):
+        current_circulation.circulation.trigger(
+            loan_created, **dict(params, trigger="extend")
+        )
+    assert loan_created["state"] == "CREATED"
+
+
+def test_trigger_many(app, db, params, mock_ensure_item_is_available_for_checkout):
+    """Test that many loans are triggered and committed at once."""
+    _, first_loan = create_loan({})
+    _, second_loan = create_loan({})
+    _, third_loan = create_loan({})
+    db.session.commit()
+
+    missing_patron = dict(params, trigger="checkout")
+    del missing_patron["patron_pid"]
+    results = current_circulation.circulation.trigger_many(
+        [
+            (first_loan, dict(params, trigger="checkout")),
+            (second_loan, missing_patron),
+            (third_loan, dict(params, trigger="checkout")),
+        ],
+        chunk_size=2,
+    )
+
+    assert [loan for loan, _ in results] == [first_loan, second_loan, third_loan]
+    assert results[0][1] is None
+    assert isinstance(results[1][1], MissingRequiredParameterError)
+    assert results[2][1] is None
+
+    assert Loan.get_record(first_loan.id)["state"] == "ITEM_ON_LOAN"
+    assert Loan.get_record(second_loan.id)["state"] == "CREATED"
+    assert Loan.get_record(third_loan.id)["state"] == "ITEM_ON_LOAN"
+
+
+def test_trigger_many_failure_after_commit(
+    app, db, params, mock_ensure_item_is_available_for_checkout
+):
+    """Test that a loan failing after its commit is not indexed."""
+    _, first_loan = create_loan({})
+    _, second_loan = create_loan({})
+    db.session.commit()
+
+    def receiver(sender, initial_loan=None, loan=None, **kwargs):
+        if loan.id == second_loan.id:
+            raise ValueError("receiver failure")
+
+    path = "invenio_circulation.indexer.bulk_index_loans"
+    with mock.patch(path) as mock_bulk_index_loans:
+        mock_bulk_index_loans.return_value = (1, [])
+        with loan_state_changed.connected_to(receiver):
+            results = current_circulation.circulation.trigger_many(
+                [
+                    (first_loan, dict(params, trigger="checkout")),
+                    (second_loan, dict(params, trigger="checkout")),
+                ]
+            )
+
+    assert results[0][1] is None
+    loan, error = results[1]
+    assert isinstance(error, ValueError)
+    assert loan["state"] == "CREATED"
+    (indexed,), _ = mock_bulk_index_loans.call_args
+    assert [loan.id for loan in indexed] == [first_loan.id]
+    assert Loan.get_record(second_loan.id)["state"] == "CREATED"
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the requests queues of the documents."""
+
+import json
+
+from flask import url_for
+
+from invenio_circulation.api import (
+    get_hold_queue,
+    get_hold_queue_position,
+    get_next_pending_loan,
+    iter_hold_queue,
+    sync_hold_queue,
+)
+from invenio_circulation.transitions.transitions import (
+    _update_document_pending_request_for_item,
+)
+
+from .helpers import SwappedConfig, create_loan
+
+
+def _create_pending_loans():
+    """Create pending loans on a document, requested on different dates."""
+    pending = dict(state="PENDING", document_pid="document_pid", patron_pid="1")
+    return [
+        create_loan(dict(pending, transaction_date=transaction_date))[1]
+        for transaction_date in (
+            "2018-01-03T00:00:00",
+            "2018-01-01T00:00:00",
+            "2018-01-02T00:00:00",
+        )
+    ]
+
+
+def test_hold_queue_table(app, db, json_headers):
+    """Test the requests queue kept in the database."""
+    with SwappedConfig("CIRCULATION_HOLD_QUEUE_TABLE", True):
+        loans = _create_pending_loans()
+        db.session.commit()
+        assert get_hold_queue("document_pid") == [
+            loans[1]["pid"],
+            loans[2]["pid"],
+            loans[0]["pid"],
+        ]
+        assert [get_hold_queue_position(loan) for loan in loans] == [3, 1, 2]
+        assert get_next_pending_loan("document_pid").id == loans[1].id
+
+        loans[1]["state"] = "CANCELLED"
+        loans[1].commit()
+        db.session.commit()
+        assert get_hold_queue_position(loans[1]) is None
+        assert get_hold_queue_position(loans[0]) == 2
+        assert get_next_pending_loan("document_pid").id == loans[2].id
+
+        with app.test_client() as client:
+            url = url_for(
+                "invenio_circulation_hold_queue.document_hold_queue_resource",
+                document_pid="document_pid",
+            )
+            res = client.get(url, headers=json_headers)
+            assert res.status_code == 200
+            payload = json.loads(res.data.decode("utf-8"))
+            assert payload["total"] == 2
+            assert payload["queue"][0] == dict(pid=loans[2]["pid"], position=1)
+
+            url = url_for(
+                "invenio_circulation_hold_queue.loan_hold_queue_position_resource",
+                pid_value=loans[0]["pid"],
+            )
+            res = client.get(url, headers=json_headers)
+            assert res.status_code == 200
+            assert json.loads(res.data.decode("utf-8"))["position"] == 2
+
+
+def test_hold_queue_table_assigns_returned_item(
+    app, db, mock_get_pending_loans_by_doc_pid
+):
+    """Test that a returned item is assigned in the order of the table."""
+    item_pid = dict(type="itemid", value="item_pid")
+    other_item_pid = dict(type="itemid", value="other_item_pid")
+    with SwappedConfig("CIRCULATION_HOLD_QUEUE_TABLE", True):
+        loans = _create_pending_loans()
+        loans[1]["item_pid"] = other_item_pid
+        loans[1].commit()
+        db.session.commit()
+        assert [loan.id for loan in iter_hold_queue("document_pid")] == [
+            loans[1].id,
+            loans[2].id,
+            loans[0].id,
+        ]
+
+        with SwappedConfig(
+            "CIRCULATION_DOCUMENT_RETRIEVER_FROM_ITEM", lambda x: "document_pid"
+        ):
+            _update_document_pending_request_for_item(item_pid)
+
+    assert not mock_get_pending_loans_by_doc_pid.called
+    loans = [loan.get_record(loan.id) for loan in loans]
+    assert "item_pid" not in loans[0]
+    assert loans[1]["item_pid"] == other_item_pid
+    assert loans[2]["item_pid"] == item_pid
+
+
+def test_sync_hold_queue(app, db):
+    """Test that the hold queue table is filled from the pending loans."""
+    loans = _create_pending_loans()
+    db.session.commit()
+
+    with SwappedConfig("CIRCULATION_HOLD_QUEUE_TABLE", True):
+        assert get_hold_queue("document_pid") == []
+
+        assert sync_hold_queue() == 3
+        assert get_hold_queue("document_pid") == [
+            loans[1]["pid"],
+            loans[2]["pid"],
+            loans[0]["pid"],
+        ]
+        assert get_hold_queue_position(loans[0]) == 3
@@ -9,7 +9,11 @@
 """Tests for loan JSON schema."""
 
 from copy import deepcopy
+from datetime import timedelta
 
+import pytest
+
+from invenio_circulation.api import Loan, LoanHit
 from invenio_circulation.proxies import current_circulation
 
 
@@ -26,3 +30,57 @@ def test_state_checkout_with_loan_pid(
 def test_indexed_loans(indexed_loans):
     """Test mappings, index creation and loans indexing."""
     assert indexed_loans
+
+
+def test_loan_snapshot(loan_created):
+    """Test that a loan snapshot is not affected by changes on the loan."""
+    snapshot = loan_created.snapshot()
+    assert snapshot == loan_created
+    assert snapshot.model is loan_created.model
+    assert loan_created.changed_fields(snapshot) == frozenset()
+
+    loan_created["state"] = "PENDING"
+    loan_created["patron_pid"] = "1"
+    assert snapshot["state"] == "CREATED"
+    assert "patron_pid" not in snapshot
+    assert loan_created.changed_fields(snapshot) == {"state", "patron_pid"}
+
+
+def test_get_records_by_pids(app, test_loans):
+    """Test that loans are fetched in bulk in the order of the pids."""
+    pids = [pid.pid_value for pid, _ in test_loans]
+    pids = list(reversed(pids)) + ["not_existing"]
+    loans = list(Loan.get_records_by_pids(pids, chunk_size=3))
+    assert [loan["pid"] for loan in loans] == pids[:-1]
+
+
+def test_loan_lazy_date_fields(loan_created):
+    """Test that date fields are parsed on access and written back if changed."""
+    loan_created["start_date"] = "2018-01-01T00:00:00"
+    loan_created["end_date"] = "2018-02-01"
+    loan_created.date_fields2datetime()
+    assert dict(loan_created)["end_date"] == "2018-02-01"
+
+    end_date = loan_created["end_date"]
+    assert end_date.date().isoformat() == "2018-02-01"
+    assert loan_created.get("end_date") is end_date
+    loan_created["start_date"] = loan_created["start_date"] + timedelta(days=1)
+
+    loan_created.date_fields2str()
+    assert loan_created["start_date"] == "2018-01-02"
+    assert loan_created["end_date"] == "2018-02-01"
+
+
+def test_loan_hit(loan_created):
+    """Test the read-only loan hits."""
+    loan_created["item_pid"] = dict(type="itemid", value="1")
+    loan_created["end_date"] = "2018-02-01"
+    hit = LoanHit(loan_created)
+    assert hit.pid == loan_created["pid"]
+    assert hit.state == "CREATED"
+    assert hit.item_pid == dict(type="itemid", value="1")
+    assert hit.end_date.date().isoformat() == "2018-02-01"
+    assert hit.start_date is None
+    assert hit.to_loan().id == loan_created.id
+    with pytest.raises(AttributeError):
+        hit.state = "PENDING"
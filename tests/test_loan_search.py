@@ -8,12 +8,21 @@
 
 """Tests for loan search class."""
 
+import pytest
+
 from invenio_circulation.api import Loan
 from invenio_circulation.search.api import (
+    search_after_scan,
     search_by_patron_item_or_document,
     search_by_patron_pid,
     search_by_pid,
+    search_exists,
+    search_hits,
 )
+from invenio_circulation.search.memory import LoansMemoryIndexer, LoansMemorySearch
+from invenio_circulation.search.sql import LoansSQLSearch
+
+from .helpers import SwappedConfig
 
 
 def _assert_total(total, expected):
@@ -142,3 +151,106 @@ def test_search_loans_by_patron_and_item_or_document_filtering_states(indexed_lo
     )
     search_result = search.execute()
     _assert_total(search_result.hits.total, 3)
+
+
+def test_search_exists_and_hits(indexed_loans):
+    """Test the existence and bounded hits search primitives."""
+    search = search_by_pid(
+        item_pid=dict(type="itemid", value="item_multiple_pending_on_loan_7"),
+        filter_states=["PENDING"],
+    )
+    assert search_exists(search)
+    assert len(search_hits(search, max_hits=1)) == 1
+    assert len(search_hits(search)) == 2
+    assert len(search_hits(search, max_hits=10)) == 2
+
+    search = search_by_pid(
+        item_pid=dict(type="itemid", value="not_existing"),
+    )
+    assert not search_exists(search)
+    assert search_hits(search) == []
+
+
+def test_search_loans_by_pid_fields(indexed_loans):
+    """Test retrieve only the requested fields of the loans."""
+    search = search_by_pid(
+        item_pid=dict(type="itemid", value="item_multiple_pending_on_loan_7"),
+        fields=["pid", "state"],
+    )
+    for hit in search.scan():
+        assert set(hit.to_dict()) == {"pid", "state"}
+
+
+def test_search_loans_sql_backend(app, test_loans):
+    """Test the loans searches on the records table."""
+    item_pid = dict(type="itemid", value="item_multiple_pending_on_loan_7")
+    search = search_by_pid(
+        item_pid=item_pid, filter_states=["PENDING", "ITEM_ON_LOAN"], backend="sql"
+    )
+    _assert_total(search.execute().hits.total, 3)
+
+    search = search_by_pid(
+        item_pid=item_pid, exclude_states=["ITEM_ON_LOAN"], backend="sql"
+    )
+    _assert_total(search.execute().hits.total, 2)
+
+    search = search_by_patron_item_or_document(
+        patron_pid="1",
+        document_pid="document_pid",
+        filter_states=["PENDING"],
+        fields=["pid"],
+        backend="sql",
+    )
+    hits = list(search.scan())
+    assert len(hits) == 3
+    assert all(set(hit.to_dict()) == {"pid"} for hit in hits)
+
+    search = search_by_pid(item_pid=item_pid, backend="sql")
+    assert search_exists(search)
+    assert len(search_hits(search, max_hits=1)) == 1
+    assert search_hits(search)[0].item_pid.value == item_pid["value"]
+
+    with SwappedConfig("CIRCULATION_LOAN_SEARCH_BACKEND", "sql"):
+        search = search_by_pid(item_pid=dict(type="itemid", value="not_existing"))
+        assert not search_exists(search)
+
+
+def test_search_loans_sql_backend_search_after(app, test_loans):
+    """Test the search_after pagination of the loans searches on the table."""
+    search = LoansSQLSearch().filter("term", patron_pid="1")
+    pids = [hit.pid for hit in search_after_scan(search, page_size=2)]
+    assert len(pids) == search.count() > 2
+    assert pids == sorted(pids)
+
+    page = search.sort("pid").extra(search_after=[pids[0]], size=2).execute()
+    assert [hit.pid for hit in page] == pids[1:3]
+    assert page.hits[-1].meta.sort == [pids[2]]
+
+    with pytest.raises(ValueError):
+        search.extra(collapse="item_pid")
+
+
+def test_search_loans_memory_backend(app, test_loans):
+    """Test the loans searches in the memory index."""
+    # the index is loaded from the database on first use
+    app.extensions.pop("invenio-circulation-loans-memory", None)
+    item_pid = dict(type="itemid", value="item_multiple_pending_on_loan_7")
+    search = LoansMemorySearch().filter("term", item_pid__value=item_pid["value"])
+    search = search.filter("term", item_pid__type=item_pid["type"])
+    _assert_total(search.filter("terms", state=["PENDING"]).execute().hits.total, 2)
+    _assert_total(search.exclude("terms", state=["PENDING"]).execute().hits.total, 1)
+    assert search_hits(search, max_hits=1)[0].item_pid.value == item_pid["value"]
+
+    search = LoansMemorySearch().filter("term", patron_pid="1")
+    search = search.filter("term", state="PENDING").source(includes=["pid"])
+    hits = list(search.sort("-pid").scan())
+    assert all(set(hit.to_dict()) == {"pid"} for hit in hits)
+    assert [hit.pid for hit in hits] == sorted((hit.pid for hit in hits), reverse=True)
+
+    _, loan = test_loans[0]
+    indexer = LoansMemoryIndexer()
+    search = LoansMemorySearch().filter("term", pid=loan["pid"])
+    indexer.delete(loan)
+    assert not search_exists(search)
+    indexer.index(loan)
+    assert search_exists(search)
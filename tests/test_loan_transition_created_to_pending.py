@@ -10,8 +10,11 @@
 
 from invenio_circulation.api import Loan
 from invenio_circulation.proxies import current_circulation
+from invenio_circulation.transitions.transitions import (
+    _update_document_pending_request_for_item,
+)
 
-from .helpers import SwappedConfig
+from .helpers import SwappedConfig, create_loan
 
 
 def test_loan_request_on_document_with_auto_available_item_assignment(
@@ -87,7 +90,8 @@ def test_loan_request_on_document_with_unavailable_items(
 
     # find an item attached to the document, which will be unavailable
     with SwappedConfig(
-        "CIRCULATION_ITEMS_RETRIEVER_FROM_DOCUMENT", lambda x: ["item_pid"]
+        "CIRCULATION_ITEMS_RETRIEVER_FROM_DOCUMENT",
+        lambda x: [dict(type="itemid", value="item_pid")],
     ):
         loan = current_circulation.circulation.trigger(
             loan_created,
@@ -171,3 +175,57 @@ def test_auto_assignment_of_returned_item_to_pending_document_requests(
                 assert pending_loan["state"] == "PENDING"
                 assert pending_loan["item_pid"] == dict(type="itemid", value="item_pid")
                 assert pending_loan["document_pid"] == "document_pid"
+
+
+def test_returned_item_assigned_to_first_pending_request(
+    app, db, mock_get_pending_loans_by_doc_pid
+):
+    """Test that a returned item is assigned to the oldest eligible request."""
+    item_pid = dict(type="itemid", value="item_pid")
+    pending = dict(state="PENDING", document_pid="document_pid", patron_pid="1")
+    pids_and_loans = [
+        create_loan(dict(pending, transaction_date="2018-01-03T00:00:00")),
+        create_loan(
+            dict(
+                pending,
+                transaction_date="2018-01-01T00:00:00",
+                request_start_date="2999-01-01",
+            )
+        ),
+        create_loan(dict(pending, transaction_date="2018-01-02T00:00:00")),
+    ]
+    loans = [loan for _, loan in pids_and_loans]
+    mock_get_pending_loans_by_doc_pid.return_value = loans
+
+    with SwappedConfig(
+        "CIRCULATION_DOCUMENT_RETRIEVER_FROM_ITEM", lambda x: "document_pid"
+    ):
+        _update_document_pending_request_for_item(item_pid)
+
+    assert "item_pid" not in loans[0]
+    assert "item_pid" not in loans[1]
+    assert loans[2]["item_pid"] == item_pid
+
+
+def test_returned_item_assigned_in_hold_queue_order(
+    app, db, mock_get_pending_loans_by_doc_pid
+):
+    """Test that the requests made at the same time follow the queue order."""
+    item_pid = dict(type="itemid", value="item_pid")
+    pending = dict(
+        state="PENDING",
+        document_pid="document_pid",
+        patron_pid="1",
+        transaction_date="2018-01-01T00:00:00",
+    )
+    loans = [create_loan(dict(pending))[1] for _ in range(3)]
+    mock_get_pending_loans_by_doc_pid.return_value = loans
+
+    with SwappedConfig(
+        "CIRCULATION_DOCUMENT_RETRIEVER_FROM_ITEM", lambda x: "document_pid"
+    ):
+        _update_document_pending_request_for_item(item_pid)
+
+    first_loan = min(loans, key=lambda loan: str(loan.id))
+    assert first_loan["item_pid"] == item_pid
+    assert all("item_pid" not in loan for loan in loans if loan is not first_loan)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for overdue loans detection."""
+
+from datetime import date
+
+from invenio_circulation.api import detect_overdue_loans
+from invenio_circulation.signals import loans_overdue
+
+
+def test_detect_overdue_loans(app, indexed_loans):
+    """Test that each run only finds the newly overdue loans."""
+    batches = []
+
+    def receiver(sender, loans):
+        batches.append(loans)
+
+    with loans_overdue.connected_to(receiver):
+        assert detect_overdue_loans(until=date(2018, 8, 23)) == 0
+        assert detect_overdue_loans(until=date(2018, 8, 24), batch_size=2) == 3
+        assert detect_overdue_loans(until=date(2018, 8, 24)) == 0
+        assert detect_overdue_loans(until=date(2018, 9, 1)) == 0
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    loans = [loan for batch in batches for loan in batch]
+    assert {loan.state for loan in loans} == {"ITEM_ON_LOAN"}
+    assert {loan.end_date.date() for loan in loans} == {date(2018, 8, 23)}
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for loans export."""
+
+import csv
+import json
+
+from flask import url_for
+
+from .helpers import SwappedConfig
+
+
+def _export(app, **params):
+    """Perform API GET to export loans."""
+    with app.test_client() as client:
+        url = url_for("invenio_circulation_loan_export.loan_export_resource", **params)
+        return client.get(url)
+
+
+def test_rest_export_loans_ndjson(app, indexed_loans):
+    """Test export of loans as NDJSON, page by page."""
+    with SwappedConfig("CIRCULATION_LOAN_EXPORT_PAGE_SIZE", 3):
+        res = _export(app, patron_pid="1")
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    loans = [json.loads(line) for line in res.data.decode("utf-8").splitlines()]
+    assert len(loans) == 8
+    assert len({loan["pid"] for loan in loans}) == 8
+    assert all(loan["patron_pid"] == "1" for loan in loans)
+
+
+def test_rest_export_loans_csv(app, indexed_loans):
+    """Test export of loans of an item as CSV."""
+    res = _export(
+        app,
+        format="csv",
+        item_pid_type="itemid",
+        item_pid_value="item_multiple_pending_on_loan_7",
+        state=["PENDING", "ITEM_ON_LOAN"],
+    )
+    assert res.status_code == 200
+    assert res.mimetype == "text/csv"
+    rows = list(csv.DictReader(res.data.decode("utf-8").splitlines()))
+    assert len(rows) == 3
+    assert {row["item_pid.value"] for row in rows} == {
+        "item_multiple_pending_on_loan_7"
+    }
+
+
+def test_rest_export_loans_invalid_params(app, indexed_loans):
+    """Test export of loans with invalid parameters."""
+    assert _export(app, format="xml").status_code == 400
+    assert _export(app, start_date_from="not a date").status_code == 400
+    assert _export(app, item_pid_type="itemid").status_code == 400
@@ -10,12 +10,16 @@
 
 import json
 
+import mock
 from flask import url_for
 
+from invenio_circulation.links import loan_links_factory
 from invenio_circulation.pidstore.fetchers import loan_pid_fetcher
 from invenio_circulation.proxies import current_circulation
 from invenio_circulation.views import build_url_action_for_pid
 
+from .helpers import SwappedConfig
+
 
 def test_rest_get_loan(app, json_headers, loan_created):
     """Test API GET call to fetch a loan by PID."""
@@ -95,3 +99,42 @@ def test_rest_loan_invalid_action(app, json_headers, params, loan_created):
     )
     assert res.status_code == 400
     assert "message" in payload
+
+
+def test_rest_action_bulk_indexes_loans_once(app, json_headers, params, loan_created):
+    """Test that the loans modified by a REST action are indexed at once."""
+    loan_pid = loan_pid_fetcher(loan_created.id, loan_created)
+
+    path = "invenio_circulation.indexer.bulk_index_loans"
+    with mock.patch(path) as mock_bulk_index_loans:
+        mock_bulk_index_loans.return_value = (1, [])
+        with SwappedConfig("CIRCULATION_LOAN_INDEX_BUFFER", True):
+            res, payload = _post(
+                app,
+                json_headers,
+                params,
+                pid_value=loan_pid.pid_value,
+                action="checkout",
+            )
+    assert res.status_code == 202
+    mock_bulk_index_loans.assert_called_once()
+    (loans,), _ = mock_bulk_index_loans.call_args
+    assert [loan["pid"] for loan in loans] == [loan_pid.pid_value]
+
+
+def test_loan_links_factory_templates(app, loan_created):
+    """Test that the action URLs are built once per action."""
+    loan_pid = loan_pid_fetcher(loan_created.id, loan_created)
+
+    with app.test_request_context():
+        expected_links = {
+            "actions": {
+                "request": build_url_action_for_pid(loan_pid, "request"),
+                "checkout": build_url_action_for_pid(loan_pid, "checkout"),
+            }
+        }
+        path = "invenio_circulation.links.build_url_action_for_pid"
+        with mock.patch(path, wraps=build_url_action_for_pid) as mock_build_url:
+            for _ in range(3):
+                assert loan_links_factory(loan_pid, loan_created) == expected_links
+            assert mock_build_url.call_count == 2
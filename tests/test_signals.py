@@ -62,3 +62,27 @@ def test_signals_loan_extend(loan_created, params):
     assert updated_loan["state"] == "ITEM_ON_LOAN"
     assert initial_loan["end_date"] != updated_loan["end_date"]
     assert trigger == "extend"
+
+
+def test_signals_changed_fields(loan_created, params):
+    """Test that the signal sends the fields changed by the transition."""
+    recorded = []
+
+    def record_signals(_, initial_loan, loan, trigger, changed_fields, **kwargs):
+        recorded.append(changed_fields)
+
+    loan_state_changed.connect(record_signals, weak=False)
+
+    current_circulation.circulation.trigger(
+        loan_created,
+        **dict(
+            params,
+            trigger="request",
+            pickup_location_pid="pickup_location_pid",
+        )
+    )
+    changed_fields = recorded.pop()
+    assert "state" in changed_fields
+    assert "patron_pid" in changed_fields
+    assert "pid" not in changed_fields
+    loan_state_changed.disconnect(record_signals)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for circulation tasks."""
+
+from datetime import date
+
+from invenio_circulation.api import Loan
+from invenio_circulation.tasks import expire_loan_requests
+
+
+def test_expire_loan_requests(app, indexed_loans):
+    """Test that loans with an expired request are cancelled."""
+    cancelled, failed = expire_loan_requests(
+        "user_pid", until=date(2018, 7, 29), chunk_size=1
+    )
+    assert (cancelled, failed) == (2, 0)
+
+    cancelled, failed = expire_loan_requests("user_pid", until=date(2018, 8, 24))
+    assert (cancelled, failed) == (3, 0)
+
+    for pid, loan in indexed_loans:
+        loan = Loan.get_record(loan.id)
+        if loan.get("request_expire_date"):
+            assert loan["state"] == "CANCELLED"
+            assert loan["cancel_reason"] == "EXPIRED"
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the transitions timing."""
+
+import pytest
+
+from invenio_circulation.proxies import current_circulation
+from invenio_circulation.signals import transition_timed
+from invenio_circulation.timing import TransitionTimings
+
+from .helpers import SwappedConfig
+
+
+def test_transition_timing(
+    loan_created, params, mock_ensure_item_is_available_for_checkout
+):
+    """Test that the phases of a transition are timed."""
+    mock_ensure_item_is_available_for_checkout.side_effect = None
+    timings = current_circulation.transition_timings
+    timings.reset()
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append(kwargs)
+
+    with transition_timed.connected_to(receiver):
+        with SwappedConfig("CIRCULATION_TRANSITION_TIMING", True):
+            loan = current_circulation.circulation.trigger(
+                loan_created, **dict(params, trigger="checkout")
+            )
+
+    assert len(received) == 1
+    assert received[0]["loan"] == loan
+    phases = received[0]["phases"]
+    assert set(phases) == {
+        "checks",
+        "before",
+        "loan_commit",
+        "db_commit",
+        "index",
+        "signal",
+        "after",
+    }
+    assert phases["loan_commit"]["sql"] > 0
+    duration = sum(phase["duration"] for phase in phases.values())
+    assert received[0]["duration"] == pytest.approx(duration)
+
+    transition = type(received[0]["transition"]).__name__
+    histogram = timings.to_dict()[transition]["loan_commit"]
+    assert histogram["count"] == 1
+    assert sum(histogram["buckets"].values()) == 1
+
+
+def test_transition_timings_histograms():
+    """Test the transition timings histograms."""
+    timings = TransitionTimings([0.01, 0.1])
+    phase = dict(duration=0.05, sql=2, search=1)
+    timings.observe("ToItemOnLoan", dict(before=phase))
+    timings.observe("ToItemOnLoan", dict(before=dict(phase, duration=1)))
+
+    histogram = timings.to_dict()["ToItemOnLoan"]["before"]
+    assert histogram["buckets"] == {"0.01": 0, "0.1": 1, "+Inf": 1}
+    assert histogram["count"] == 2
+    assert histogram["sql"] == 4
+
+    lines = timings.to_prometheus().splitlines()
+    name = "invenio_circulation_transition_phase_seconds"
+    labels = 'transition="ToItemOnLoan",phase="before"'
+    assert '{}_bucket{{{},le="0.1"}} 1'.format(name, labels) in lines
+    assert '{}_bucket{{{},le="+Inf"}} 2'.format(name, labels) in lines
+    assert "{}_count{{{}}} 2".format(name, labels) in lines
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for circulation unit of work."""
+
+import mock
+import pytest
+
+from invenio_circulation.api import Loan
+from invenio_circulation.indexer import _index_action, bulk_index_loans, index_loans
+from invenio_circulation.proxies import current_circulation
+from invenio_circulation.uow import unit_of_work
+
+
+def test_unit_of_work_commit(
+    loan_created, db, params, mock_ensure_item_is_available_for_checkout
+):
+    """Test that the unit of work commits and indexes the loans once."""
+    path = "invenio_circulation.indexer.bulk_index_loans"
+    with mock.patch(path) as mock_bulk_index_loans:
+        mock_bulk_index_loans.return_value = (1, [])
+        with unit_of_work():
+            loan = current_circulation.circulation.trigger(
+                loan_created, **dict(params, trigger="checkout")
+            )
+            current_circulation.circulation.trigger(
+                loan, **dict(params, trigger="extend")
+            )
+            mock_bulk_index_loans.assert_not_called()
+
+    mock_bulk_index_loans.assert_called_once_with([loan])
+    db.session.expire_all()
+    loan = Loan.get_record(loan_created.id)
+    assert loan["state"] == "ITEM_ON_LOAN"
+    assert loan["extension_count"] == 1
+
+
+def test_unit_of_work_rollback(
+    loan_created, db, params, mock_ensure_item_is_available_for_checkout
+):
+    """Test that the unit of work is rolled back on errors."""
+    path = "invenio_circulation.indexer.bulk_index_loans"
+    with mock.patch(path) as mock_bulk_index_loans:
+        with pytest.raises(ValueError):
+            with unit_of_work():
+                current_circulation.circulation.trigger(
+                    loan_created, **dict(params, trigger="checkout")
+                )
+                raise ValueError()
+
+    mock_bulk_index_loans.assert_not_called()
+    assert Loan.get_record(loan_created.id)["state"] == "CREATED"
+
+
+def test_index_action(app, db, test_loans):
+    """Test that the bulk actions of the loans are the ones of the indexer."""
+    indexer = current_circulation.loan_indexer()
+    loan = test_loans[0][1]
+    expected = indexer._index_action(dict(id=str(loan.id)))
+    assert _index_action(indexer, loan) == expected
+
+
+def test_bulk_index_loans_reports_failures(app, db, test_loans):
+    """Test that the loans failing to be indexed are reported."""
+    loans = [loan for _, loan in test_loans[:3]]
+    error = {"index": {"_id": str(loans[1].id), "status": 400, "error": "error"}}
+    with mock.patch("invenio_circulation.indexer.search.helpers.bulk") as bulk:
+        bulk.return_value = (2, [error])
+        assert bulk_index_loans(loans) == (2, [str(loans[1].id)])
+
+    (_, actions), kwargs = bulk.call_args
+    assert kwargs["raise_on_error"] is False
+    assert [action["_id"] for action in actions] == [str(loan.id) for loan in loans]
+    assert actions[0]["_source"]["pid"] == loans[0]["pid"]
+
+
+def test_index_loans_queues_failures(app, db, test_loans):
+    """Test that the loans failing to be indexed are queued."""
+    loans = [loan for _, loan in test_loans[:2]]
+    path = "invenio_circulation.indexer.bulk_index_loans"
+    with mock.patch(path) as mock_bulk_index_loans:
+        with mock.patch("invenio_indexer.api.RecordIndexer.bulk_index") as bulk_index:
+            mock_bulk_index_loans.return_value = (1, [str(loans[1].id)])
+            assert index_loans(loans) == [str(loans[1].id)]
+            bulk_index.assert_called_once_with([str(loans[1].id)])
+
+            mock_bulk_index_loans.side_effect = ConnectionError()
+            assert index_loans(loans) == [str(loan.id) for loan in loans]
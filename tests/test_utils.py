@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Invenio-Circulation is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for circulation utils."""
+
+import arrow
+import pytest
+
+from invenio_circulation.utils import str2datetime
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2020-01-02",
+        "2020-01-02T03:04",
+        "2020-01-02T03:04:05",
+        "2020-01-02T03:04:05.12Z",
+        "2020-01-02T03:04:05.123456+00:00",
+        "2020-01-02T03:04:05+02:00",
+        arrow.get("2020-01-02T03:04:05+00:00"),
+    ],
+)
+def test_str2datetime(value):
+    """Test that dates are parsed as by arrow."""
+    parsed = str2datetime(value)
+    assert parsed == arrow.get(value).to("utc")
+    assert parsed.isoformat() == arrow.get(value).to("utc").isoformat()
+
+
+def test_str2datetime_invalid():
+    """Test that invalid dates are rejected."""
+    with pytest.raises(ValueError):
+        str2datetime("2020-02-30")